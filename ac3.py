@@ -1,136 +1,232 @@
-import copy
+import multiprocessing
+import os
+import threading
+import time
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from catalog import on_catalog_loaded
+from conflicts import ConflictIndex
+from tracing import Tracer, OFF, SUMMARY, ARC, CHECK
+from search import ScheduleSearch, SolutionCounter
+from ranking import RankedSearch
 
 class AC3:
-    def __init__(self, courses, cid_constraints, session_constraints=None ,no_class_constraints=None):
+    def __init__(self, courses, cid_constraints, session_constraints=None ,no_class_constraints=None,
+                 conflict_index=None, tracer=None, propagation='fc', course_names=None,
+                 section_ids=None, seed_domains=None, domains=None):
         """
         :courses: List[Course] (must have .id and .name)
         :cid_constraints: dict course_id -> list of timeslot strings
         :session_constraints: List[Course] that the user pre-selected
+        :conflict_index: ConflictIndex built for cid_constraints; pass one in to
+                         reuse it across runs on the same catalog
+        :tracer: Tracer that collects progress, counters and timings
+                 (defaults to summary level)
+        :propagation: look-ahead during search, 'fc' (forward checking) or
+                      'mac' (maintain arc consistency)
+        :course_names: only these courses become variables (default: every course;
+                       courses of picked sections are always included)
+        :section_ids: only these sections are candidate values (default: all)
+        :seed_domains: dict course_name -> section ids already known to be
+                       arc consistent for a superset of these constraints
+                       (see precompute_program_domains); domains start from
+                       their intersection with these
+        :domains: dict course_name -> section ids that are already arc
+                  consistent, in search order (see IncrementalAC3); skips
+                  domain initialization and AC-3
         """
         self.courses = courses
         self.cid_constraints = cid_constraints
+        self.index = conflict_index or ConflictIndex(cid_constraints)
         self.constraints_from_session = session_constraints or []
         self.no_class = no_class_constraints or []
-        self.progress = []  # Collecting progress for debugging
+        self.tracer = tracer or Tracer(SUMMARY)
+        self.progress = self.tracer.events  # Collecting progress for display
         self.domains = {}
-
-        # Debug: print cid_constraints when initializing
-        print("DEBUG [AC3 - cid_constraints initialized]:")
-        for course_id, timeslots in self.cid_constraints.items():
-            print(f"  - Course ID {course_id}: {timeslots}")
-        
-        self._init_domains()
-        self._init_queue()
+        self.cursor = None
+        self.propagation = propagation
+        self.course_names = None if course_names is None else set(course_names)
+        self.section_ids = None if section_ids is None else set(section_ids)
+        self.seed_domains = seed_domains
+        self._propagated = False
+
+        if self.tracer.level >= CHECK:
+            for course_id, info in self.cid_constraints.items():
+                self.tracer.emit(CHECK, f"Course ID {course_id}: {info}")
+
+        if domains is not None:
+            self.domains = dict(domains)
+            self._propagated = True
+        else:
+            with self.tracer.phase("init"):
+                self._init_domains()
+                self._init_queue()
+
+    @classmethod
+    def from_loader(cls, course_loader, picks=(), no_class=(), program=None, **kwargs):
+        """
+        Solver over a CourseDataLoader's catalog, given picked section ids and
+        (day, time) no-class pairs; extra kwargs go to __init__. With a
+        program, only its courses and sections are considered, starting from
+        the program's precomputed domains when they are available.
+        """
+        by_id = course_loader.get_course_id_mapping()
+        if program is not None:
+            catalog = course_loader.catalog
+            kwargs.setdefault('course_names', catalog.program_courses.get(program, ()))
+            kwargs.setdefault('section_ids', catalog.program_sections.get(program, ()))
+            kwargs.setdefault('seed_domains', program_domains(catalog).get(program))
+        return cls(
+            courses=course_loader.load_courses(),
+            cid_constraints=course_loader.get_course_id_constraint_mapping(),
+            session_constraints=[by_id[cid][0] for cid in picks if cid in by_id],
+            no_class_constraints=list(no_class),
+            conflict_index=course_loader.get_conflict_index(),
+            **kwargs
+        )
 
     def _init_domains(self):
         """
-        Initialize domains by iterating over cid_constraints:
+        Initialize domains in one pass over the index's course -> sections lists:
           • Honor user picks (unless they conflict with no_class)
-          • Then fill in all other IDs, skipping forbidden slots
+          • Then give every other course its sections outside the forbidden slots
         """
+        masks = self.index.masks
+        forbidden = self.index.slot_mask(f"{day} {time}" for day, time in self.no_class)
         raw = {}
-        forbidden = {f"{day} {time}" for day, time in self.no_class}
 
-       # 1) Lock in user picks by ID, using cid_constraints to check slots
+        # 1) Lock in user picks by ID
         skipped_picks = []
         for c in self.constraints_from_session:
             cid = c.id
             info = self.cid_constraints.get(cid)
             if not info:
                 continue
-            # if any of this CID’s slots conflict, skip entirely
-            if all(slot not in forbidden for slot in info['constraints']):
+            if not masks[cid] & forbidden:
                 raw.setdefault(info['course_name'], set()).add(cid)
             else:
                 skipped_picks.append(f"{cid}")
 
         if skipped_picks:
-            self.progress.append(
+            self.tracer.emit(SUMMARY,
                 f"Skipped picked {', '.join(skipped_picks)} due to no-class constraint"
         )
 
-
-        # 2) Fill in all other IDs from cid_constraints, grouped by course_name
-        for cid, info in self.cid_constraints.items():
-            name = info['course_name']
-            # if user already locked in this variable, skip
-            if name in raw:
+        # 2) Every other course: its sections minus those in a no-class slot, reported once
+        scope_names, scope_ids = self.course_names, self.section_ids
+        for name, sections in self.index.course_sections.items():
+            if name in raw or (scope_names is not None and name not in scope_names):
                 continue
-
-            allowed = set()
-            pruned = []
-
-            for cid_, detail in self.cid_constraints.items():
-                if detail['course_name'] != name:
+            if scope_ids is not None:
+                sections = [cid for cid in sections if cid in scope_ids]
+                if not sections:
                     continue
-                if all(slot not in forbidden for slot in detail['constraints']):
-                    allowed.add(cid_)
-                else:
-                    pruned.append(cid_)
-
-            if pruned:
-                self.progress.append(
+            allowed = [cid for cid in sections if not masks[cid] & forbidden]
+            if len(allowed) < len(sections):
+                pruned = [cid for cid in sections if masks[cid] & forbidden]
+                self.tracer.emit(SUMMARY,
                     f"Pruned {', '.join(pruned)} from {name} due to no-class constraint"
                 )
-
             raw[name] = allowed
 
-
-        # 3) Sort by domain size and convert to lists
+        # 3) Sort by domain size and convert to lists in catalog order, so the
+        #    search order (and with it every cursor) is reproducible
         sorted_items = sorted(raw.items(), key=lambda kv: len(kv[1]))
-        self.domains = {name: list(ids) for name, ids in sorted_items}
-
-        # DEBUG
-        print("DEBUG [AC3 - Domains initialized]:")
-        for name, dom in self.domains.items():
-            print(f"  - {name}: {dom}")
-        self.progress.append(
+        position = self.index.position
+        self.domains = {name: sorted(ids, key=position.__getitem__) for name, ids in sorted_items}
+
+        # 4) Start from precomputed arc-consistent domains. The variable order
+        #    above is kept, and AC-3 reaches the same fixpoint either way
+        if self.seed_domains:
+            for name, dom in self.domains.items():
+                seed = self.seed_domains.get(name)
+                if seed is not None:
+                    self.domains[name] = [cid for cid in dom if cid in seed]
+            self.tracer.emit(SUMMARY, "Started from precomputed program domains")
+
+        if self.tracer.level >= ARC:
+            for name, dom in self.domains.items():
+                self.tracer.emit(ARC, f"Domain {name}: {dom}")
+        self.tracer.emit(SUMMARY,
             "Domains initialized: " +
             ", ".join(f"{n}({len(d)})" for n, d in self.domains.items())
         )
 
     def _init_queue(self):
         """
-        Initialize the queue of arcs to be processed by the AC-3 algorithm.
+        Build the constraint graph and the initial queue of arcs.
+
+        Two course names are neighbours only if some section of one can
+        overlap some section of the other; every other pair is always
+        consistent, so its arcs are never enqueued. `in_queue` mirrors the
+        queue so an arc is never queued twice.
         """
         vars_ = list(self.domains)
-        self.queue = deque((Xi, Xj) for Xi in vars_ for Xj in vars_ if Xi != Xj)
-        self.progress.append(f"Queue initialized with {len(self.queue)} arcs")
+        clashes = {var: self.index.clash_bits(self.domains[var]) for var in vars_}
+        bits = {var: self.index.bits_of(self.domains[var]) for var in vars_}
+        self.neighbors = {
+            Xi: [Xj for Xj in vars_ if Xj != Xi and clashes[Xi] & bits[Xj]]
+            for Xi in vars_
+        }
+        self.queue = deque((Xi, Xj) for Xi in vars_ for Xj in self.neighbors[Xi])
+        self.in_queue = set(self.queue)
+        self._last_support = {}  # (Xi, vi, Xj) -> position of vi's last support in Xj
+        self.tracer.emit(SUMMARY, f"Queue initialized with {len(self.queue)} arcs")
+
+    def _wipe_out(self):
+        """
+        A course has no section left, so no full schedule exists. Plain AC-3
+        over every pair of variables would empty every domain in turn; do it
+        directly instead.
+        """
+        self.tracer.emit(SUMMARY, "A course has no valid section left; no schedule exists.")
+        for name in self.domains:
+            self.domains[name] = []
+        self.queue.clear()
+        self.in_queue.clear()
 
     def _no_conflict(self, a, b):
         """
         Checks if two course IDs (a, b) have conflicting timeslots.
         Returns True if there is no conflict, and False if there is a conflict.
         """
-        # Debug: print the course ids and their corresponding timeslots
-        print(f"DEBUG [AC3 - Checking conflict] - Course {a} vs Course {b}:")
-        print(f"  - Course {a} Timeslots: {self.cid_constraints[a]['constraints']}")
-        print(f"  - Course {b} Timeslots: {self.cid_constraints[b]['constraints']}")
-
-        # Iterate over the timeslots for both courses a and b
-        for con in self.cid_constraints[a]['constraints']:
-            for con2 in self.cid_constraints[b]['constraints']:
-                if con == con2:  # If timeslots conflict
-                    self.progress.append(f"Conflict detected: Course {a} and Course {b} have overlapping timeslot {con}")
-                    return False  # There is a conflict
-        return True  # No conflict found
+        return not self.index.masks[a] & self.index.masks[b]
 
 
     def revise(self, Xi, Xj):
         pruned = False
         newdom = []
-        
-        # Debug: print the domains being revised
-        print(f"DEBUG [AC3 - Revising] - Revising domain for {Xi} (Current domain: {self.domains[Xi]})")
-        
+        tracer = self.tracer
+        tracer.count("revisions")
+        tracer.count("conflict_checks", len(self.domains[Xi]))
+        if tracer.level >= ARC:
+            tracer.emit(ARC, f"Revising {Xi} against {Xj} (domain: {self.domains[Xi]})")
+
+        # Keep vi if there's some vj in Xj that doesn't conflict. AC-2001
+        # style: first check whether vi's last known support is still in Xj,
+        # otherwise look up a new one in the compatibility table against
+        # Xj's domain as a bitset
+        support = self.index.bits_of(self.domains[Xj])
+        compatible = self.index.compatible
+        last_support = self._last_support
         for vi in self.domains[Xi]:
-            # Keep vi if there's some vj in Xj that doesn't conflict
-            if any(self._no_conflict(vi, vj) for vj in self.domains[Xj]):
+            key = (Xi, vi, Xj)
+            last = last_support.get(key)
+            if last is not None and support >> last & 1:
+                newdom.append(vi)
+                tracer.count("support_hits")
+                continue
+            found = compatible[vi] & support
+            if found:
+                last_support[key] = (found & -found).bit_length() - 1
                 newdom.append(vi)
+                if tracer.level >= CHECK:
+                    tracer.emit(CHECK, f"{vi} in {Xi} has support in {Xj}")
             else:
                 pruned = True
-                self.progress.append(f"Pruned {vi} from {Xi} (no support in {Xj})")
+                tracer.count("values_pruned")
+                if tracer.level >= ARC:
+                    tracer.emit(ARC, f"Pruned {vi} from {Xi} (no support in {Xj})")
         
         if pruned:
             self.domains[Xi] = newdom
@@ -141,84 +237,286 @@ class AC3:
         """
         Perform the AC-3 algorithm, pruning the domains of the variables.
         """
-        # Debug: before pruning
-        self.progress.append(f"DEBUG - Domains before pruning: {self.domains}")
-
-        while self.queue:
-            Xi, Xj = self.queue.popleft()
-            if self.revise(Xi, Xj):
-                # re-enqueue affected arcs
-                for Xk in self.domains:
-                    if Xk not in (Xi, Xj):
-                        self.queue.append((Xk, Xi))
-
-        # Debug: after pruning
-        self.progress.append(f"DEBUG - Domains after pruning: {self.domains}")
-        self.progress.append("AC-3 done.")
+        tracer = self.tracer
+        if tracer.level >= ARC:
+            tracer.emit(ARC, f"Domains before pruning: {self.domains}")
+
+        with tracer.phase("ac3"):
+            if any(not dom for dom in self.domains.values()):
+                self._wipe_out()
+            while self.queue:
+                Xi, Xj = self.queue.popleft()
+                self.in_queue.discard((Xi, Xj))
+                tracer.count("arcs")
+                if self.revise(Xi, Xj):
+                    if not self.domains[Xi]:
+                        self._wipe_out()
+                        break
+                    # re-enqueue affected arcs
+                    for Xk in self.neighbors[Xi]:
+                        if Xk != Xj and (Xk, Xi) not in self.in_queue:
+                            self.queue.append((Xk, Xi))
+                            self.in_queue.add((Xk, Xi))
+
+        if tracer.level >= ARC:
+            tracer.emit(ARC, f"Domains after pruning: {self.domains}")
+        tracer.emit(SUMMARY, "AC-3 done.")
         return self.progress
 
    
 
-    def _is_consistent(self, assignment, vars_):
-        seen = set()
-        for var in vars_:
-            cid = assignment.get(var)  # Get the course ID corresponding to the course_name
-            if cid is None:
-                continue
-            for slot in self.cid_constraints[cid]["constraints"]:
-                if slot in seen:
-                    return False
-                seen.add(slot)
-        return True
-
-
-
-
-    def solve(self):
+    def solve(self, workers=None):
         """
         Run AC-3, then perform depth-first backtracking to find all valid assignments.
-        Stops after all depth-0 (first variable) values have been used.
+        With `workers`, the search is spread over that many processes.
         """
-        self.run()  # Apply AC-3
-
-        # Remove empty domains
-        self.domains = {k: v for k, v in self.domains.items() if v}
-        if not self.domains:
-            return []
-
-        solutions = []
-        vars_ = list(self.domains.keys())
-        first_var = vars_[0]
-        first_domain = self.domains[first_var]
-
+        if workers:
+            return list(self.iter_solutions_parallel(workers))
+        return list(self.iter_solutions())
+
+    def _prepare(self):
+        if not self._propagated:
+            self.run()  # Apply AC-3
+            # Remove empty domains
+            self.domains = {k: v for k, v in self.domains.items() if v}
+            self._propagated = True
+
+    def count_solutions(self):
+        """
+        Number of schedules solve() would return, computed without listing
+        them (see SolutionCounter).
+        """
+        self._prepare()
+        with self.tracer.phase("count"):
+            count = SolutionCounter(self.index, self.domains, self.tracer).count()
+        self.tracer.emit(SUMMARY, f"{count} schedules. " + self.tracer.summary())
+        return count
 
-        def backtrack(assignment, depth):
-            # If full assignment is found
-            if len(assignment) == len(vars_) and self._is_consistent(assignment,vars_) :
-                solutions.append(assignment.copy())
+    def iter_solutions(self, limit=None, cursor=None, stop=None):
+        """
+        Lazily yield valid assignments (dict course_name -> course_id) in a fixed
+        order, stopping after `limit` of them if given, or early once the
+        optional `stop` callable returns True (see ScheduleSearch; it is polled
+        during the search, not only between solutions).
+
+        After each yield, `self.cursor` holds the position of that solution in
+        the search (one candidate index per depth). Passing it back as `cursor`
+        to a fresh AC3 built from the same inputs resumes right after it.
+        """
+        self._prepare()
+        tracer = self.tracer
+        if not self.domains or limit == 0:
+            tracer.emit(SUMMARY, tracer.summary())
+            return
+
+        search = ScheduleSearch(self.index, self.domains, tracer, self.propagation, stop)
+        found = 0
+        started = time.perf_counter()
+        for solution in search.solutions(cursor):
+            found += 1
+            self.cursor = search.cursor
+            tracer.count("solutions")
+            tracer.add_time("search", time.perf_counter() - started)
+            yield solution
+            started = time.perf_counter()
+            if limit is not None and found >= limit:
+                tracer.emit(SUMMARY, tracer.summary())
                 return
-            
-
-            var = vars_[depth]
-            for val in self.domains[var]:
-                assignment[var] = val
-
-                if self._is_consistent(assignment,vars_):
-                    backtrack(assignment, depth + 1)
 
-                # Backtrack
-                del assignment[var]
-            
-
-        # Manually loop over each root value
-        for root_val in first_domain:
-            assignment = {first_var: root_val}
-            backtrack(assignment, 1)
-
-        return solutions
+        tracer.add_time("search", time.perf_counter() - started)
+        tracer.emit(SUMMARY, tracer.summary())
 
+    def iter_ranked(self, objective, k=10):
+        """
+        Lazily yield the k best schedules under a ScheduleObjective as
+        (cost, solution) pairs, cheapest first, by best-first branch and
+        bound over the arc-consistent domains.
+        """
+        self._prepare()
+        tracer = self.tracer
+        if not self.domains or k <= 0:
+            tracer.emit(SUMMARY, tracer.summary())
+            return
+
+        with tracer.phase("rank_setup"):
+            costs = objective.compile(self.index, self.cid_constraints, self.courses)
+        search = ScheduleSearch(self.index, self.domains, tracer, self.propagation)
+        started = time.perf_counter()
+        for cost, solution in RankedSearch(search, costs).best(k):
+            tracer.add_time("search", time.perf_counter() - started)
+            yield cost, solution
+            started = time.perf_counter()
+        tracer.add_time("search", time.perf_counter() - started)
+        tracer.emit(SUMMARY, tracer.summary())
+
+    def iter_solutions_parallel(self, workers=None, limit=None, tasks_per_worker=4, chunk_size=500):
+        """
+        Same solutions, in the same order, as iter_solutions(), enumerated on a
+        process pool.
+
+        The search tree is cut at the shallowest depth that yields at least
+        `tasks_per_worker` subtrees per worker (the root variable's values
+        first, deeper split points if those are too few to balance). Workers
+        solve a subtree `chunk_size` solutions at a time and hand back a
+        cursor to continue from, so results stream in bounded pieces. At most
+        `workers * 2` chunks are submitted or finished but not yet consumed,
+        so memory stays within that many chunks however slowly the caller
+        reads; a subtree's next chunk is queued as soon as its current one is
+        taken, and new subtrees start as slots free up. Chunks are merged in
+        subtree order, so the output is deterministic. Closing the generator
+        early cancels whatever is still queued and does not wait for running
+        chunks.
+        """
+        self._prepare()
+        tracer = self.tracer
+        if not self.domains or limit == 0:
+            tracer.emit(SUMMARY, tracer.summary())
+            return
 
-       
-        
-       
-      
+        workers = workers or os.cpu_count() or 1
+        vars_ = list(self.domains)
+        search = ScheduleSearch(self.index, self.domains, tracer, self.propagation)
+        depth = 1
+        prefixes = search.frontier(depth)
+        while len(prefixes) < workers * tasks_per_worker and depth < len(vars_):
+            depth += 1
+            prefixes = search.frontier(depth)
+        tracer.emit(SUMMARY, f"Split search at depth {depth} into {len(prefixes)} subtrees")
+
+        if limit is not None:
+            chunk_size = min(chunk_size, limit)
+        found = 0
+        context = multiprocessing.get_context('spawn')
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_init_subtree_worker,
+                                   initargs=(self.index, self.domains, self.propagation))
+        inflight = {}       # subtree number -> future of its next chunk
+        started = 0         # subtrees whose first chunk has been submitted
+        cap = workers * 2
+
+        def fill():
+            nonlocal started
+            while len(inflight) < cap and started < len(prefixes):
+                inflight[started] = pool.submit(_solve_subtree, prefixes[started], None, chunk_size)
+                started += 1
+
+        try:
+            for i, prefix in enumerate(prefixes):
+                fill()
+                while i in inflight:
+                    rows, cursor, nodes = inflight.pop(i).result()
+                    if cursor is not None:
+                        inflight[i] = pool.submit(_solve_subtree, prefix, cursor, chunk_size)
+                    fill()
+                    tracer.count("nodes", nodes)
+                    for row in rows:
+                        found += 1
+                        tracer.count("solutions")
+                        yield dict(zip(vars_, row))
+                        if limit is not None and found >= limit:
+                            return
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            tracer.emit(SUMMARY, tracer.summary())
+
+
+# ——— Subtree workers for AC3.iter_solutions_parallel ———
+
+_worker_search = None
+
+
+def _init_subtree_worker(index, domains, propagation):
+    global _worker_search
+    _worker_search = ScheduleSearch(index, domains, Tracer(SUMMARY), propagation)
+
+
+def _solve_subtree(prefix, cursor, limit):
+    """
+    Up to `limit` solutions under one prefix, resuming after `cursor`, as
+    (rows of course ids in variable order, cursor to continue from or None
+    when the subtree is done, nodes visited).
+    """
+    search = _worker_search
+    before = search.tracer.counters["nodes"]
+    rows = []
+    solutions = search.subtree(prefix, cursor)
+    for sol in solutions:
+        rows.append(tuple(sol.values()))
+        if len(rows) == limit:
+            cursor = search.cursor
+            break
+    else:
+        cursor = None
+    solutions.close()
+    return rows, cursor, search.tracer.counters["nodes"] - before
+
+
+# ——— Per-program domains, precomputed when a catalog is loaded ———
+
+_program_domains = {}  # catalog version -> {program: {course_name: frozenset(section ids)}}
+_program_domains_lock = threading.Lock()
+
+
+def _program_ac3(program, cid_constraints):
+    """Arc-consistent domains of one program with no picks or no-class slots."""
+    algo = AC3([], cid_constraints, tracer=Tracer(OFF))
+    algo.run()
+    return program, algo.domains
+
+
+def precompute_program_domains(catalog, workers=None):
+    """
+    Run plain AC-3 for every program of catalog (its own courses and
+    sections, no picks or no-class slots), one program per process.
+    Returns {program: {course_name: frozenset(section ids)}}.
+
+    Picks and no-class slots only add constraints, so any later solve of a
+    program stays inside these domains and can start from them.
+    """
+    tasks = []
+    for program, sections in catalog.program_sections.items():
+        # Plain dicts: the catalog's read-only mappings cannot be pickled
+        tasks.append((program, {cid: dict(catalog.id_constraints[cid]) for cid in sections}))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        results = [_program_ac3(*task) for task in tasks]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(_program_ac3, *zip(*tasks)))
+    return {program: {name: frozenset(ids) for name, ids in domains.items()}
+            for program, domains in results}
+
+
+def program_domains(catalog, workers=None):
+    """
+    precompute_program_domains for catalog, computed once per catalog
+    version and kept until a newer version of the same file is computed.
+    """
+    domains = _program_domains.get(catalog.version)
+    if domains is None:
+        with _program_domains_lock:
+            domains = _program_domains.get(catalog.version)
+            if domains is None:
+                domains = precompute_program_domains(catalog, workers)
+                # Older versions of the same file are never asked for again;
+                # other catalog files keep theirs
+                path = catalog.version[0]
+                for version in [v for v in _program_domains if v[0] == path]:
+                    del _program_domains[version]
+                _program_domains[catalog.version] = domains
+    return domains
+
+
+@on_catalog_loaded
+def _warm_program_domains(catalog):
+    """
+    Start precomputing a newly loaded catalog's program domains in the
+    background; solves that need them wait on program_domains' lock. Only
+    the main process does this, so spawned workers that import the app
+    never start pools of their own.
+    """
+    if multiprocessing.parent_process() is None:
+        threading.Thread(target=program_domains, args=(catalog,), daemon=True,
+                         name="program-domains").start()
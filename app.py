@@ -1,163 +1,46 @@
-from flask import Flask, render_template, request, session, redirect, url_for
-import json
-import pandas as pd
-from typing import List, Dict
-from collections import defaultdict
-from datetime import datetime
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify
+import numpy as np
+from typing import List
 import ast
-from ac3 import AC3 
-from pso import BinaryPSO
+import threading
+from incremental import IncrementalAC3
+from catalog import Course, CourseDataLoader
+from ranking import ScheduleObjective
+from pso_inputs import PSOInputBuilder, iter_preference_rows
+from tracing import Tracer
+from result_store import ResultStore, canonical_key
+from jobs import JobManager, JobQueueFull
+from timeslots import IntervalModel, parse_slot
 
 
 
 app = Flask(__name__)
 app.secret_key = "super secret key"  # Required for using sessions
+app.config.setdefault('AC3_TRACE_LEVEL', 'summary')  # off / summary / arc / check
+app.config.setdefault('AC3_PAGE_SIZE', 20)  # schedules per /generated_schedules page
+app.config.setdefault('AC3_MAX_PAGE_JUMP', 10)  # pages a request may solve past the last known one
+app.config.setdefault('RESULT_STORE_MAX_BYTES', 64 * 1024 * 1024)
+app.config.setdefault('RESULT_STORE_TTL', 3600)  # seconds
 
+# Solver results live here, keyed by run id (a canonical hash of the solve's
+# inputs, so it doubles as the solve memo). The cookie session only holds ids.
+result_store = ResultStore(max_bytes=app.config['RESULT_STORE_MAX_BYTES'],
+                           ttl=app.config['RESULT_STORE_TTL'])
 
+# Solve-level memo counters: runs found in the store vs. newly started.
+# result_store.hits / misses count every lookup, page views included.
+ac3_run_stats = {'reused': 0, 'created': 0}
+_ac3_run_stats_lock = threading.Lock()
 
+app.config.setdefault('JOB_WORKERS', 2)   # solver processes
+app.config.setdefault('JOB_QUEUE', 8)     # jobs allowed to wait for a worker
+app.config.setdefault('AC3_JOB_PAGES', 50)  # an AC-3 job keeps at most this many pages of schedules
+job_manager = JobManager(max_workers=app.config['JOB_WORKERS'],
+                         max_queued=app.config['JOB_QUEUE'])
 
 
-class Course:
-    def __init__(self, name, program, instructor, id, room, day, time, comments):
-        self.name = name
-        self.program = program
-        self.instructor = instructor
-        self.id = id
-        self.room = room
-        self.day = day
-        self.time = time
-        self.comments = comments
 
-    def __str__(self):
-        return f"{self.name} - {self.instructor} - {self.id} | {self.time} | {self.day} | Room: {self.room}"
 
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'program': self.program,
-            'instructor': self.instructor,
-            'id': self.id,
-            'room': self.room,
-            'day': self.day,
-            'time': self.time,
-            'comments': self.comments
-        }
-
-    @staticmethod
-    def from_dict(data):
-        return Course(**data)
-
-    def __eq__(self, other):
-        return isinstance(other, Course) and self.id == other.id and self.day == other.day and self.time == other.time
-
-    def __hash__(self):
-        return hash((self.id, self.day, self.time))
-
-class CourseDataLoader:
-    REQUIRED_FIELDS = {
-        'name': str,
-        'program': str,
-        'instructor': str,
-        'id': str,
-        'room': str,
-        'day': str,
-        'time': str,
-        'comments': str
-    }
-
-    def __init__(self, json_path):
-        self.json_path = json_path
-
-    def load_courses(self) -> List[Course]:
-        with open(self.json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        courses = []
-        for idx, item in enumerate(data):
-            validated = {}
-            for field, field_type in self.REQUIRED_FIELDS.items():
-                value = item.get(field, "").strip()
-                if not isinstance(value, field_type):
-                    value = field_type(value)
-                if field in ('day', 'time'):
-                    value = value.replace(" ", "")
-                validated[field] = value
-            courses.append(Course(**validated))
-        return courses
-
-    def get_available_programs(self):
-        return list({course.program for course in self.load_courses()})
-
-    def load_courses_by_program(self, program_name):
-        return [course for course in self.load_courses() if course.program == program_name]
-
-    def get_schedule(self, program_name):
-        schedule = defaultdict(lambda: defaultdict(list))
-        for course in self.load_courses_by_program(program_name):
-            schedule[course.time][course.day].append(course)
-        return schedule
-
-    def get_highlighted_course_ids(self):
-        course_ids = defaultdict(list)
-        for course in self.load_courses():
-            course_ids[course.id].append(course)
-        colors = ["#f0f8ff", "#faebd7", "#98fb98", "#d3d3d3", "#ffb6c1", "#ffcccb"]
-        course_colors = {}
-        for i, course_id in enumerate(course_ids):
-            course_colors[course_id] = colors[i % len(colors)]
-        return course_colors
-
-    def get_course_by_id(self, course_id):
-        return [course for course in self.load_courses() if course.id == course_id]
-
-    def get_course_id_mapping(self):
-        course_id_mapping = defaultdict(list)
-        for course in self.load_courses():
-            course_id_mapping[course.id].append(course)
-        return course_id_mapping 
-    
-    def get_course_id_constraint_mapping(self):
-        from collections import defaultdict
-
-
-        course_id_constraint_mapping = defaultdict(lambda: {'constraints': [], 'course_name': None})
-        course_id_mapping = self.get_course_id_mapping()
-
-        for course_id, courses in course_id_mapping.items():
-            for course in courses:
-                if course_id_constraint_mapping[course_id]['course_name'] is None:
-                    course_id_constraint_mapping[course_id]['course_name'] = course.name
-
-                day = normalize(course.day)
-                time = normalize(course.time)
-                constraint_key = f"{day} {time}"
-                course_id_constraint_mapping[course_id]['constraints'].append(constraint_key)
-
-        return course_id_constraint_mapping
-    
-    def get_course_name_to_ids_mapping(self):
-        """
-        Returns a dict mapping each course name to a list of course IDs that share that name.
-        """
-        name_to_ids = defaultdict(list)
-        for course in self.load_courses():
-            
-            name_to_ids[course.name].append(course.id)
-        return name_to_ids
-    
-    def get_course_id_to_time_mapping(self):
-
-        id_to_time  = defaultdict (list)
-        for course in self.load_courses():
-            day = normalize(course.day)
-            time = normalize(course.time)
-            time_key = f"{day} {time}"
-            id_to_time[course.id].append(time_key)
-        return id_to_time
-
-
-def normalize(s):
-        return " ".join(s.strip().split())
 
 def get_constraints_from_session():
     return [Course.from_dict(c) for c in session.get('constraints', [])]
@@ -182,51 +65,6 @@ def save_no_class_constraints_to_session(no_class_list):
     session.modified = True
 
 
-from datetime import datetime
-
-def parse_time_slot(time_input):
-    """
-    Accept either:
-      - A string "Day HH-HH" or "Day HH–HH"
-      - A list/tuple [Day, start_hour, end_hour]
-    Returns (day, start_datetime, end_datetime).
-    """
-    # Case 1: already a Day/HH-HH string
-    if isinstance(time_input, str):
-        day, time_range = time_input.strip().split()
-        start_str, end_str = time_range.replace('–', '-').split('-')
-        start = datetime.strptime(start_str.strip(), '%H')
-        end = datetime.strptime(end_str.strip(), '%H')
-
-    # Case 2: list/tuple [Day, start, end]
-    elif isinstance(time_input, (list, tuple)) and len(time_input) == 3:
-        day = str(time_input[0]).strip()
-        start = datetime.strptime(str(time_input[1]).strip(), '%H')
-        end   = datetime.strptime(str(time_input[2]).strip(), '%H')
-
-    else:
-        raise ValueError(f"Invalid time slot format: {time_input!r}")
-
-    return day, start, end
-
-
-def check_time_conflict(times1, times2):
-    """
-    Given two lists of time slots (each slot either a string or [day, start, end]),
-    returns True if any slot in times1 overlaps any in times2 on the same day.
-    """
-    # Parse into canonical (day, start, end) tuples
-    slots1 = [parse_time_slot(t) for t in times1]
-    slots2 = [parse_time_slot(t) for t in times2]
-
-    # Check pairwise overlap
-    for day1, s1, e1 in slots1:
-        for day2, s2, e2 in slots2:
-            if day1 == day2 and (s1 < e2 and s2 < e1):
-                return True
-
-    return False
-
 @app.route('/', methods=['GET', 'POST'])
 def index():
     session.clear()
@@ -252,7 +90,6 @@ def schedule():
 
     course_loader = CourseDataLoader('courses.json')
     highlighted_course_ids = course_loader.get_highlighted_course_ids()
-    all_courses = course_loader.load_courses()
     # cid_constraints=course_loader.get_course_id_constraint_mapping()
     
 
@@ -265,8 +102,8 @@ def schedule():
     if request.method == 'POST':
         if 'course_id' in request.form:
             course_id = request.form['course_id']
-            for c in all_courses:
-                if c.id == course_id and c not in constraints:
+            for c in course_loader.get_course_by_id(course_id):
+                if c not in constraints:
                     constraints.append(c)
             save_constraints_to_session(constraints)
 
@@ -278,6 +115,18 @@ def schedule():
         if 'no_class_day' in request.form and 'no_class_time' in request.form:
             day = request.form['no_class_day']
             time = request.form['no_class_time']
+            try:
+                parse_slot(f"{day} {time}")
+            except ValueError:
+                return render_template(
+                    'schedule.html',
+                    program_name=program_name,
+                    schedule=schedule,
+                    highlighted_course_ids=highlighted_course_ids,
+                    constraints=constraints,
+                    no_class_constraints=no_class_constraints,
+                    error=f"Invalid no-class time: {day} {time}",
+                ), 400
             if (day, time) not in no_class_constraints:
                 no_class_constraints.append((day, time))
                 save_no_class_constraints_to_session(no_class_constraints)
@@ -321,38 +170,169 @@ def make_schedule():
     
     return render_template('make_schedule.html')
 
+def build_ac3(course_loader, picks, no_class, program=None):
+    """
+    AC-3 solver over the program's part of the catalog (all of it without a
+    program) with the given picked section ids and no-class slots.
+
+    It comes from the session's IncrementalAC3, which keeps the propagated
+    domains between requests: adding or removing one pick or no-class slot
+    only re-propagates what that constraint touches. The state lives in the
+    result store, under an id kept in the session, and is rebuilt when the
+    program or the catalog changes.
+    """
+    version = course_loader.catalog.version
+    key = session.get('solver_state')
+    entry = result_store.get(key) if key else None
+    if entry is None or entry['catalog_version'] != version or entry['program'] != program:
+        key = key or ResultStore.new_key()
+        session['solver_state'] = key
+        entry = {
+            'catalog_version': version,
+            'program': program,
+            'state': IncrementalAC3.from_loader(course_loader, program=program),
+            'lock': threading.Lock(),
+        }
+
+    with entry['lock']:
+        state = entry['state']
+        ac3_algo = state.solver(picks, no_class, tracer=Tracer(app.config['AC3_TRACE_LEVEL']))
+        result_store.put(key, entry, state.nbytes)
+    return ac3_algo
+
+
+def start_ac3_run(course_loader):
+    """
+    Find or register the AC-3 run for the session's constraints and remember
+    only its id in the session.
+
+    Runs are keyed by a canonical hash of (catalog version, program, picked
+    section ids, no-class slots), so sessions asking for the same schedule
+    share one run, including every page already solved for it.
+    """
+    picks = sorted({c.id for c in get_constraints_from_session()})
+    no_class = sorted({tuple(nc) for nc in get_no_class_constraints_from_session()})
+    run_id = canonical_key(course_loader.catalog.version, session.get('program_name'), picks, no_class)
+    session['ac3_run'] = run_id
+
+    new = {
+        'catalog_version': course_loader.catalog.version,
+        'program': session.get('program_name'),
+        'picks': picks,
+        'no_class': no_class,
+        'vars': None,         # course names, the column order of every page array
+        'cursors': [None],    # cursors[p - 1]: search cursor where page p starts
+        'pages': {},          # page -> (int32 array of section positions, has_next)
+        'last_page': None,    # set once the search has run out of solutions
+        'progress': [],
+        'lock': threading.Lock(),   # held while a page is solved into the run
+    }
+    run = result_store.setdefault(run_id, new, _run_nbytes(new))
+    with _ac3_run_stats_lock:
+        ac3_run_stats['created' if run is new else 'reused'] += 1
+        stats = dict(ac3_run_stats)
+    app.logger.info("AC-3 run %s %s (%d reused, %d created so far)", run_id[:12],
+                    'created' if run is new else 'reused', stats['reused'], stats['created'])
+    return run_id, run
+
+
+@app.route('/ac3_stats', methods=['GET'])
+def ac3_stats():
+    """Memo counters: shared AC-3 runs reused vs. started, and the result store's lookups and size."""
+    with _ac3_run_stats_lock:
+        runs = dict(ac3_run_stats)
+    return jsonify(runs=runs, store={
+        'entries': len(result_store), 'bytes': result_store.nbytes,
+        'max_bytes': result_store.max_bytes, 'hits': result_store.hits, 'misses': result_store.misses,
+    })
+
+
+def _run_nbytes(run):
+    """Rough memory footprint of a stored run, for the store's byte budget."""
+    arrays = sum(rows.nbytes for rows, _ in run['pages'].values())
+    cursors = sum(8 * len(c) for c in run['cursors'] if c)
+    return 512 + arrays + cursors + sum(len(p) for p in run['progress'])
+
+
 @app.route('/ac3_schedule', methods=['GET','POST'])
 def ac3_schedule():
-    # Load courses and both kinds of constraints
-    course_loader = CourseDataLoader('courses.json')
-    session_course_constraints = get_constraints_from_session() 
-    session_no_class = get_no_class_constraints_from_session()
-
-    # Initialize AC-3 with no-class constraints, too
-    ac3_algo = AC3(
-        courses=course_loader.load_courses(),
-        cid_constraints=course_loader.get_course_id_constraint_mapping(),
-        session_constraints=session_course_constraints,
-        no_class_constraints=session_no_class
-    )
+    # Solutions are enumerated a page at a time by generated_schedules and
+    # kept in the server-side result store; the session only holds the run id
+    start_ac3_run(CourseDataLoader('courses.json'))
+    return redirect(url_for('generated_schedules'))
 
-    # Run and store
-    solutions = ac3_algo.solve()
-    session['ac3_solutions'] = solutions
-    session['ac3_progress'] = ac3_algo.progress
 
-    return redirect(url_for('generated_schedules'))
+def _solve_page(course_loader, run_id, run, page):
+    """Enumerate one page of run into it; the caller holds run['lock']."""
+    page_size = app.config['AC3_PAGE_SIZE']
+    index = course_loader.get_conflict_index()
+    ac3_algo = build_ac3(course_loader, run['picks'], run['no_class'], run['program'])
+    cursors = run['cursors']
+
+    # Resume from the nearest page whose start is known and walk forward,
+    # recording page starts on the way; one extra solution tells us if
+    # there is a next page
+    start = min(page, len(cursors))
+    skip = (page - start) * page_size
+    solutions = []
+    n = 0
+    for n, sol in enumerate(ac3_algo.iter_solutions(limit=skip + page_size + 1,
+                                                    cursor=cursors[start - 1]), 1):
+        if n <= skip:
+            if n % page_size == 0:
+                cursors.append(list(ac3_algo.cursor))
+        elif n <= skip + page_size:
+            solutions.append(sol)
+            if n == skip + page_size and len(cursors) == page:
+                cursors.append(list(ac3_algo.cursor))
+
+    if run['vars'] is None:
+        run['vars'] = list(ac3_algo.domains)
+        run['progress'] = list(ac3_algo.progress)
+    rows = np.array([[index.position[sol[var]] for var in run['vars']] for sol in solutions],
+                    dtype=np.int32).reshape(len(solutions), len(run['vars']))
+    run['pages'][page] = (rows, n > skip + page_size)
+    if n <= skip + page_size:
+        # Exhausted: n solutions were left from page `start` onwards
+        run['last_page'] = max(start - 1 + -(-n // page_size), 1)
+    result_store.put(run_id, run, _run_nbytes(run))
 
 
 @app.route('/generated_schedules', methods=['GET'])
 def generated_schedules():
-    solutions = session.get('ac3_solutions', [])
-    progress = session.get('ac3_progress', [])
-    all_rows = [] 
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = app.config['AC3_PAGE_SIZE']
 
     course_loader = CourseDataLoader('courses.json')
     course_id_mapping = course_loader.get_course_id_constraint_mapping()
-    idx=0
+    index = course_loader.get_conflict_index()
+
+    run_id = session.get('ac3_run')
+    run = result_store.get(run_id) if run_id else None
+    if run is None or run['catalog_version'] != course_loader.catalog.version:
+        # expired, evicted or built on an older catalog: start over
+        run_id, run = start_ac3_run(course_loader)
+
+    # Each request solves at most AC3_MAX_PAGE_JUMP pages past the furthest
+    # known page start, so it stays short enough for the request thread
+    furthest = len(run['cursors']) + app.config['AC3_MAX_PAGE_JUMP']
+    if page > furthest and page not in run['pages'] and run['last_page'] is None:
+        return redirect(url_for('generated_schedules', page=furthest))
+
+    # The run is shared by every session with the same inputs; solve pages
+    # into it one request at a time so cursors[p - 1] stays page p's start
+    with run['lock']:
+        if page not in run['pages'] and (run['last_page'] is None or page <= run['last_page']):
+            _solve_page(course_loader, run_id, run, page)
+    # Past the end, known before or found just now: go to the last page
+    if run['last_page'] is not None and page > run['last_page']:
+        return redirect(url_for('generated_schedules', page=run['last_page']))
+
+    rows, has_next = run['pages'][page]
+
+    solutions = [{var: index.ids[pos] for var, pos in zip(run['vars'], row)} for row in rows.tolist()]
+    progress = run['progress']
+
     schedule_tables = []
     for sol in solutions:
         
@@ -369,211 +349,363 @@ def generated_schedules():
                 }
                 rows.append(row)
         schedule_tables.append(rows)
-        # Add to master list for CSV, with a header row for each solution
-    #     df = pd.DataFrame(rows)
-    #     df.insert(0, 'Solution', f'Solution #{idx + 1}')
-    #     all_rows.append(df)
 
-    #     # Add a blank row (gap) between solutions
-    #     all_rows.append(pd.DataFrame([[""] * len(df.columns)], columns=df.columns))
-    #     idx+=1
+    return render_template('generated_schedules.html',
+                           schedule_tables=schedule_tables,
+                           progress=progress,
+                           page=page,
+                           has_next=has_next,
+                           offset=(page - 1) * page_size)
+
+
+def parse_objective(args):
+    """ScheduleObjective from /ranked_schedules query args; weights default to 1."""
+    instructors = [name for name in args.get('instructors', '').split(',') if name.strip()]
+    return ScheduleObjective(
+        days_weight=args.get('days', 1.0, type=float),
+        gap_weight=args.get('gaps', 1.0, type=float),
+        instructor_weight=args.get('instructor', 1.0, type=float),
+        edge_weight=args.get('edges', 1.0, type=float),
+        preferred_instructors=instructors,
+        earliest=args.get('earliest', '09:00'),
+        latest=args.get('latest', '17:00'),
+    )
+
 
-    # # Concatenate all into a single DataFrame and save to CSV
-    # final_df = pd.concat(all_rows, ignore_index=True)
-    # final_df.to_csv("generated_schedules.csv", index=False)
+@app.route('/ranked_schedules', methods=['GET'])
+def ranked_schedules():
+    """
+    The k best schedules for the session's constraints under soft
+    preferences (?k=&days=&gaps=&edges=&instructor=&instructors=a,b&earliest=&latest=).
+    """
+    k = min(max(request.args.get('k', 10, type=int), 1), app.config['AC3_PAGE_SIZE'])
+    try:
+        objective = parse_objective(request.args)
+    except ValueError as e:
+        return jsonify(error=f"Invalid objective: {e}"), 400
+
+    course_loader = CourseDataLoader('courses.json')
+    course_id_mapping = course_loader.get_course_id_constraint_mapping()
+    picks = sorted({c.id for c in get_constraints_from_session()})
+    no_class = sorted({tuple(nc) for nc in get_no_class_constraints_from_session()})
+    ac3_algo = build_ac3(course_loader, picks, no_class, session.get('program_name'))
+    ranked = list(ac3_algo.iter_ranked(objective, k))
+
+    schedule_tables = []
+    for _, sol in ranked:
+        rows = []
+        for var, cid in sol.items():
+            course_info = course_id_mapping.get(cid)
+            if course_info:
+                rows.append({
+                    'id': cid,
+                    'name': course_info['course_name'],
+                    'constraints': course_info['constraints'],
+                })
+        schedule_tables.append(rows)
 
     return render_template('generated_schedules.html',
                            schedule_tables=schedule_tables,
-                           progress=progress)
-
+                           scores=[cost for cost, _ in ranked],
+                           progress=ac3_algo.progress,
+                           page=1,
+                           has_next=False,
+                           offset=0)
 
 
+@app.route('/count_schedules', methods=['GET'])
+def count_schedules():
+    """How many schedules fit the session's program and constraints, without listing them."""
+    course_loader = CourseDataLoader('courses.json')
+    picks = sorted({c.id for c in get_constraints_from_session()})
+    no_class = sorted({tuple(nc) for nc in get_no_class_constraints_from_session()})
+    program = session.get('program_name')
+    count = build_ac3(course_loader, picks, no_class, program).count_solutions()
+    return jsonify(program=program, picks=picks, no_class=no_class, count=count)
 
 
-# @app.route('/generated_schedules', methods=['GET'])
-# def generated_schedules():
-#     solutions = session.get('ac3_solutions', [])
-#     progress = session.get('ac3_progress', [])
+class FormError(ValueError):
+    """Input that parses but does not fit together; shown to the user as-is."""
 
-#     course_loader = CourseDataLoader('courses.json')
-#     course_id_mapping = course_loader.get_course_id_constraint_mapping()
 
-#     schedule_tables = []
-#     all_rows = []  # To collect rows for CSV
+def parse_pso_form(form, files=None):
+    """
+    make_pso keyword arguments from the /pso_schedule form. The problem comes
+    from the catalog plus an uploaded preference file when one is given,
+    otherwise from the literal fields.
+    Raises FormError for mismatched lengths, other exceptions for bad syntax.
+    """
+    # 1) Parse numeric and weight inputs
+    num_particles         = int(form['num_particles'])
+    max_iterations        = int(form['max_iterations'])
+    inertia_weight        = float(form['inertia_weight'])
+    cognitive_coefficient = float(form['cognitive_coefficient'])
+    social_coefficient    = float(form['social_coefficient'])
+    preference_weight     = float(form['preference_weight'])
+    time_weight           = float(form['time_weight'])
+    label_weight          = float(form['label_weight'])
+    capacity_weight       = float(form['capacity_weight'])
+    course_load_weight    = float(form['course_load_weight'])
+    seed                 =int(form['seed'])
+
+    # Optional stopping criteria; blank means "not set"
+    def optional(name, cast, default=None):
+        value = form.get(name, '').strip()
+        return cast(value) if value else default
+    target_fitness = optional('target_fitness', float, 0)
+    patience       = optional('patience', int)
+    time_budget    = optional('time_budget', float)
+    min_diversity  = optional('min_diversity', float)
+    compact        = form.get('compact') in ('on', 'true', '1')
+    islands            = optional('islands', int)
+    migration_interval = optional('migration_interval', int, 10)
+    if islands is not None and islands > 1 and compact:
+        raise FormError("Island mode cannot be combined with compact mode.")
+    if migration_interval < 1:
+        raise FormError("Migration interval must be at least 1.")
+
+    upload = files.get('preferences_file') if files else None
+    if upload is not None and upload.filename:
+        problem = _catalog_pso_problem(form, upload)
+    else:
+        problem = _literal_pso_problem(form)
+
+    return dict(
+        problem,
+        num_particles=num_particles, max_iterations=max_iterations,
+        inertia_weight=inertia_weight, cognitive_coefficient=cognitive_coefficient,
+        social_coefficient=social_coefficient,
+        preference_weight=preference_weight, time_weight=time_weight,
+        label_weight=label_weight, capacity_weight=capacity_weight,
+        course_load_weight=course_load_weight, seed=seed,
+        target_fitness=target_fitness, patience=patience,
+        time_budget=time_budget, min_diversity=min_diversity,
+        compact=compact, islands=islands, migration_interval=migration_interval,
+    )
 
-#     for idx, sol in enumerate(solutions):
-#         rows = []
-#         for var, cid in sol.items():
-#             course_info = course_id_mapping.get(cid)
-#             if course_info:
-#                 course_name = course_info['course_name']
-#                 constraints = course_info['constraints']  # List of "Day Time" strings
-#                 row = {
-#                     'ID': cid,
-#                     'Name': course_name,
-#                     'Constraints': ", ".join(constraints)
-#                 }
-#                 rows.append(row)
-#         schedule_tables.append(rows)
 
-#         # Add to master list for CSV, with a header row for each solution
-#         df = pd.DataFrame(rows)
-#         df.insert(0, 'Solution', f'Solution #{idx + 1}')
-#         all_rows.append(df)
+def _catalog_pso_problem(form, upload):
+    """PSO problem from courses.json sections and a streamed preference upload."""
+    program = form.get('program') or None
+    catalog = CourseDataLoader('courses.json').catalog
+    try:
+        builder = PSOInputBuilder(catalog, program)
+        problem = builder.build(iter_preference_rows(upload.stream, upload.filename))
+    except ValueError as e:
+        raise FormError(str(e))
+    if not problem['num_students']:
+        raise FormError("The preference file has no rows.")
+    problem['course_names'] = [f"{label} ({cid})"
+                               for label, cid in zip(builder.course_labels, builder.section_ids)]
+    problem['student_names'] = builder.student_ids
+    return problem
+
+
+def _literal_pso_problem(form):
+    """PSO problem typed into the form as Python literals."""
+    num_students = int(form['num_students'])
+    num_courses  = int(form['num_courses'])
+
+    # 2) Parse list‐like inputs
+    student_preferences = ast.literal_eval(form['student_preferences'])
+    course_times         = ast.literal_eval(form['course_times'])
+    course_caps          = ast.literal_eval(form['course_caps'])
+
+    # 3) Robustly parse course labels
+    raw_labels = form.getlist('course_labels')
+    if len(raw_labels) == 1:
+        try:
+            parsed = ast.literal_eval(raw_labels[0])
+            course_labels = [str(l).strip() for l in parsed] if isinstance(parsed, list) \
+                            else [l.strip() for l in raw_labels[0].split(',')]
+        except:
+            course_labels = [l.strip() for l in raw_labels[0].split(',')]
+    else:
+        course_labels = [str(l).strip() for l in raw_labels]
+
+    # 4) Validate lengths
+    if len(course_labels) != num_courses:
+        raise FormError("Number of course labels must match number of courses.")
+    if len(course_caps) != num_courses:
+        raise FormError("Number of course capacities must match number of courses.")
+    if len(student_preferences) != num_students:
+        raise FormError("Number of student preference lists must match number of students.")
+    if len(course_times) != num_courses:
+        raise FormError("Number of course times must match number of courses.")
+
+    return dict(
+        num_students=num_students, num_courses=num_courses,
+        student_preferences=student_preferences, course_times=course_times,
+        course_labels=course_labels, course_caps=course_caps,
+    )
 
-#         # Add a blank row (gap) between solutions
-#         all_rows.append(pd.DataFrame([[""] * len(df.columns)], columns=df.columns))
 
-#     # Concatenate all into a single DataFrame and save to CSV
-#     final_df = pd.concat(all_rows, ignore_index=True)
-#     final_df.to_csv("generated_schedules.csv", index=False)
+def render_pso_results(params, best_solution, best_fitness, history=(), stop_reason=None):
+    """
+    Render pso_results.html for the best enrolment found for params;
+    history and stop_reason describe how the run converged.
+    """
+    num_students        = params['num_students']
+    num_courses         = params['num_courses']
+    student_preferences = params['student_preferences']
+    course_times        = params['course_times']
+    course_labels       = params['course_labels']
+    course_caps         = params['course_caps']
+    preference_weight   = params['preference_weight']
+    time_weight         = params['time_weight']
+    label_weight        = params['label_weight']
+    capacity_weight     = params['capacity_weight']
+    course_load_weight  = params['course_load_weight']
+
+    enrollment_matrix = np.asarray(best_solution).tolist()
+    course_names      = params.get('course_names') or [f"Course {i+1}" for i in range(num_courses)]
+    student_names     = params.get('student_names') or [f"Student {i+1}" for i in range(num_students)]
+
+    # 6) Violations as masks over the enrolment matrix; course pairs are compared once
+    enrolled = np.asarray(best_solution, dtype=bool)
+    preferred = np.zeros((num_students, num_courses), dtype=bool)
+    for i, prefs in enumerate(student_preferences):
+        preferred[i, [j for j in prefs if 0 <= j < num_courses]] = True
+    course_overlaps = IntervalModel(range(num_courses), course_times).overlap_matrix()
+    label_ids = np.unique(np.asarray(course_labels, dtype=str), return_inverse=True)[1]
+    label_counts = enrolled.astype(np.int32) @ np.eye(label_ids.max(initial=-1) + 1, dtype=np.int32)[label_ids]
+
+    label_violation      = enrolled & (label_counts[:, label_ids] > 1)
+    time_violation       = enrolled & (enrolled.astype(np.int32) @ course_overlaps.astype(np.int32) > 0)
+    capacity_violation   = enrolled & (enrolled.sum(axis=0) > np.asarray(course_caps))[None]
+    preference_violation = enrolled & ~preferred
+
+    # 7) violation_matrix with CSS classes, highest-priority violation first
+    violation_matrix = np.select(
+        [label_violation, time_violation, capacity_violation, preference_violation, enrolled],
+        ['bg-red-100', 'bg-orange-100', 'bg-yellow-100', 'bg-blue-100', 'bg-green-100'],
+        default='',
+    ).tolist()
+
+    # 8) Render with precomputed matrices
+    return render_template('pso_results.html',
+        enrollment_matrix=enrollment_matrix,
+        violation_matrix=violation_matrix,
+        course_names=course_names,
+        student_names=student_names,
+        best_fitness=best_fitness,
+        iterations=len(history),
+        stop_reason=stop_reason,
+        course_labels=course_labels,
+        course_caps=course_caps,
+        preference_weight=preference_weight,
+        time_weight=time_weight,
+        label_weight=label_weight,
+        capacity_weight=capacity_weight,
+        course_load_weight=course_load_weight,
+        student_preferences=student_preferences,
+        course_times=course_times,
+    )
 
-#     return render_template('generated_schedules.html',
-#                            schedule_tables=schedule_tables,
-#                            progress=progress)
 
 
 @app.route('/pso_schedule', methods=['GET', 'POST'])
 def pso_schedule():
     if request.method == 'POST':
+        # Runs can take minutes (and island runs start processes), so the
+        # form only queues a job; the status page polls it
         try:
-            # 1) Parse numeric and weight inputs
-            num_students          = int(request.form['num_students'])
-            num_courses           = int(request.form['num_courses'])
-            num_particles         = int(request.form['num_particles'])
-            max_iterations        = int(request.form['max_iterations'])
-            inertia_weight        = float(request.form['inertia_weight'])
-            cognitive_coefficient = float(request.form['cognitive_coefficient'])
-            social_coefficient    = float(request.form['social_coefficient'])
-            preference_weight     = float(request.form['preference_weight'])
-            time_weight           = float(request.form['time_weight'])
-            label_weight          = float(request.form['label_weight'])
-            capacity_weight       = float(request.form['capacity_weight'])
-            course_load_weight    = float(request.form['course_load_weight'])
-            seed                 =int(request.form['seed'])
-
-            # 2) Parse list‐like inputs
-            student_preferences = ast.literal_eval(request.form['student_preferences'])
-            course_times         = ast.literal_eval(request.form['course_times'])
-            course_caps          = ast.literal_eval(request.form['course_caps'])
-
-            # 3) Robustly parse course labels
-            raw_labels = request.form.getlist('course_labels')
-            if len(raw_labels) == 1:
-                try:
-                    parsed = ast.literal_eval(raw_labels[0])
-                    course_labels = [str(l).strip() for l in parsed] if isinstance(parsed, list) \
-                                    else [l.strip() for l in raw_labels[0].split(',')]
-                except:
-                    course_labels = [l.strip() for l in raw_labels[0].split(',')]
-            else:
-                course_labels = [str(l).strip() for l in raw_labels]
-
-            # 4) Validate lengths
-            if len(course_labels) != num_courses:
-                return render_template('pso_schedule.html', error="Number of course labels must match number of courses.")
-            if len(course_caps) != num_courses:
-                return render_template('pso_schedule.html', error="Number of course capacities must match number of courses.")
-            if len(student_preferences) != num_students:
-                return render_template('pso_schedule.html', error="Number of student preference lists must match number of students.")
-            if len(course_times) != num_courses:
-                return render_template('pso_schedule.html', error="Number of course times must match number of courses.")
-
-            # 5) Run PSO
-            pso = BinaryPSO(
-                num_students, num_courses, num_particles, max_iterations,
-                inertia_weight, cognitive_coefficient, social_coefficient,
-                student_preferences, course_times, course_labels, course_caps,
-                preference_weight, time_weight, label_weight, capacity_weight,
-                course_load_weight, seed
-            )
-            best_solution, best_fitness = pso.run()
-            enrollment_matrix = best_solution.tolist()
-            course_names      = [f"Course {i+1}" for i in range(num_courses)]
-            student_names     = [f"Student {i+1}" for i in range(num_students)]
-
-            # 6) Build time_conflicts
-            time_conflicts = [[[] for _ in range(num_courses)] for _ in range(num_students)]
-            for i in range(num_students):
-                for c1 in range(num_courses):
-                    for c2 in range(c1+1, num_courses):
-                        if check_time_conflict(course_times[c1], course_times[c2]):
-                            time_conflicts[i][c1].append(c2)
-                            time_conflicts[i][c2].append(c1)
-
-            # 7) Precompute violation_matrix with CSS classes
-            priority_map = {
-                'label':      'bg-red-100',
-                'time':       'bg-orange-100',
-                'capacity':   'bg-yellow-100',
-                'preference': 'bg-blue-100',
-                'none':       'bg-green-100'
-            }
-            # count enrollments per course
-            course_counts = [sum(row[j] for row in enrollment_matrix) for j in range(num_courses)]
-            violation_matrix = []
-            for i in range(num_students):
-                # labels for selected courses
-                selected = [j for j in range(num_courses) if enrollment_matrix[i][j] == 1]
-                label_counts = {}
-                for j in selected:
-                    lab = course_labels[j]
-                    label_counts[lab] = label_counts.get(lab, 0) + 1
-
-                row_classes = []
-                for j in range(num_courses):
-                    if enrollment_matrix[i][j] == 0:
-                        row_classes.append('')  # not enrolled
-                        continue
-
-                    vio = set()
-                    # preference violation
-                    if j not in student_preferences[i]:
-                        vio.add('preference')
-                    # capacity violation
-                    if course_counts[j] > course_caps[j]:
-                        vio.add('capacity')
-                    # time conflict violation
-                    if any(other in time_conflicts[i][j] for other in selected):
-                        vio.add('time')
-                    # label conflict violation
-                    if label_counts.get(course_labels[j], 0) > 1:
-                        vio.add('label')
-
-                    # pick highest‐priority violation
-                    for key in ('label','time','capacity','preference'):
-                        if key in vio:
-                            row_classes.append(priority_map[key])
-                            break
-                    else:
-                        row_classes.append(priority_map['none'])
-
-                violation_matrix.append(row_classes)
-
-            # 8) Render with precomputed matrices
-            return render_template('pso_results.html',
-                enrollment_matrix=enrollment_matrix,
-                violation_matrix=violation_matrix,
-                course_names=course_names,
-                student_names=student_names,
-                best_fitness=best_fitness,
-                course_labels=course_labels,
-                course_caps=course_caps,
-                preference_weight=preference_weight,
-                time_weight=time_weight,
-                label_weight=label_weight,
-                capacity_weight=capacity_weight,
-                course_load_weight=course_load_weight,
-                student_preferences=student_preferences,
-                course_times=course_times,
-                time_conflicts=time_conflicts
-            )
-
+            params = parse_pso_form(request.form, request.files)
+            job_id = job_manager.submit('pso', params)
+        except FormError as e:
+            return render_template('pso_schedule.html', error=str(e), programs=pso_programs())
+        except JobQueueFull as e:
+            return render_template('pso_schedule.html', programs=pso_programs(),
+                                   error=f"Solver queue is full, try again shortly ({e})"), 429
         except Exception as e:
-            return render_template('pso_schedule.html', error=f"Invalid input format: {e}")
+            return render_template('pso_schedule.html', error=f"Invalid input format: {e}",
+                                   programs=pso_programs())
+        return redirect(url_for('pso_job', job_id=job_id))
 
     # GET method
-    return render_template('pso_schedule.html')
+    return render_template('pso_schedule.html', programs=pso_programs())
+
+
+@app.route('/pso_schedule/<job_id>', methods=['GET'])
+def pso_job(job_id):
+    """Progress page for a queued PSO run; it polls /jobs/<id> and opens the results when done."""
+    info = job_manager.status(job_id, limit=0)
+    if info is None or info['kind'] != 'pso':
+        return redirect(url_for('pso_schedule'))
+    return render_template('pso_job.html', job_id=job_id,
+                           max_iterations=job_manager.get(job_id)['params']['max_iterations'])
+
+
+def pso_programs():
+    return CourseDataLoader('courses.json').get_available_programs()
+
+
+def _submit_job(kind, params):
+    try:
+        job_id = job_manager.submit(kind, params)
+    except JobQueueFull as e:
+        return jsonify(error=f"Solver queue is full, try again shortly ({e})"), 429
+    return jsonify(job_id=job_id, status_url=url_for('job_status', job_id=job_id)), 202
+
+
+@app.route('/jobs/ac3', methods=['POST'])
+def submit_ac3_job():
+    # Every solution lives in the job manager until the job expires, so cap them
+    cap = app.config['AC3_PAGE_SIZE'] * app.config['AC3_JOB_PAGES']
+    requested = request.form.get('max_solutions', type=int)
+    params = {
+        'json_path': 'courses.json',
+        'program': session.get('program_name'),
+        'picks': sorted({c.id for c in get_constraints_from_session()}),
+        'no_class': sorted({tuple(nc) for nc in get_no_class_constraints_from_session()}),
+        'max_solutions': min(requested, cap) if requested and requested > 0 else cap,
+    }
+    return _submit_job('ac3', params)
+
+
+@app.route('/jobs/pso', methods=['POST'])
+def submit_pso_job():
+    try:
+        params = parse_pso_form(request.form, request.files)
+    except FormError as e:
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        return jsonify(error=f"Invalid input format: {e}"), 400
+    return _submit_job('pso', params)
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    info = job_manager.status(job_id,
+                              offset=request.args.get('offset', 0, type=int),
+                              limit=request.args.get('limit', 100, type=int))
+    if info is None:
+        return jsonify(error="Unknown job"), 404
+    return jsonify(info)
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    if not job_manager.cancel(job_id):
+        return jsonify(error="Unknown job"), 404
+    return jsonify(job_manager.status(job_id, limit=0))
+
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """
+    Render a PSO job's best enrolment with the results page; a job
+    cancelled while running shows its best-so-far enrolment.
+    """
+    info = job_manager.status(job_id, limit=0)
+    if info is None or info['kind'] != 'pso':
+        return jsonify(error="Unknown PSO job"), 404
+    if 'result' not in info:
+        return jsonify(info), 409
+    result = info['result']
+    return render_pso_results(job_manager.get(job_id)['params'],
+                              result['best_position'], result['best_fitness'],
+                              result['history'], result['stop_reason'])
 
 
 @app.route('/algorithm_handler', methods=['POST'])
@@ -0,0 +1,471 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, Tuple
+
+import numpy as np
+
+import catalog_store
+from conflicts import ConflictIndex
+from timeslots import MINUTES_PER_DAY, parse_slot
+
+# Seats per section when the courses file has no capacity column (or a blank value)
+DEFAULT_CAPACITY = 50
+
+# Compiled catalogs live next to their JSON, e.g. courses.json -> courses.catalog
+CATALOG_SUFFIX = '.catalog'
+
+
+class StringTable:
+    """Interned strings: each distinct value is stored once and referenced by an int code."""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class CourseTable:
+    """
+    Columnar store for course meeting rows.
+
+    Text fields are int32 codes into one shared StringTable; the meeting time
+    is also kept numerically (day index and start/end minutes, -1 when the
+    row's day/time cannot be parsed), as is the section's seat capacity.
+    Course objects are views onto a row.
+    """
+
+    FIELDS = ('name', 'program', 'instructor', 'id', 'room', 'day', 'time', 'comments')
+
+    def __init__(self, strings, columns, day_index, start, end, capacity):
+        self.content_hash = None   # set when loaded from a compiled catalog
+        self.strings = strings
+        self.columns = columns
+        self.day_index = day_index
+        self.start = start
+        self.end = end
+        self.capacity = capacity
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build from an iterable of dicts holding every field in FIELDS and
+        optionally an int 'capacity' (DEFAULT_CAPACITY when missing or None).
+        """
+        strings = StringTable()
+        codes = {field: [] for field in cls.FIELDS}
+        day_index, start, end, capacity = [], [], [], []
+        for record in records:
+            for field in cls.FIELDS:
+                codes[field].append(strings.code(record[field]))
+            seats = record.get('capacity')
+            capacity.append(DEFAULT_CAPACITY if seats is None else seats)
+            try:
+                lo, hi = parse_slot(f"{record['day']} {record['time']}")
+            except ValueError:
+                day_index.append(-1)
+                start.append(-1)
+                end.append(-1)
+            else:
+                day_index.append(lo // MINUTES_PER_DAY)
+                start.append(lo % MINUTES_PER_DAY)
+                end.append(hi - lo + lo % MINUTES_PER_DAY)
+
+        columns = {field: np.array(values, dtype=np.int32) for field, values in codes.items()}
+        return cls(strings, columns,
+                   np.array(day_index, dtype=np.int8),
+                   np.array(start, dtype=np.int16),
+                   np.array(end, dtype=np.int16),
+                   np.array(capacity, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def save(self, path, meta=None):
+        """Write as a compiled catalog file; returns its content hash."""
+        offsets, blob = catalog_store.encode_strings(self.strings.values)
+        arrays = {f'col_{field}': self.columns[field] for field in self.FIELDS}
+        arrays.update(day_index=self.day_index, start=self.start, end=self.end,
+                      capacity=self.capacity, string_offsets=offsets, string_blob=blob)
+        return catalog_store.write(path, arrays, dict(meta or {}, rows=len(self)))
+
+    @classmethod
+    def load(cls, path, verify=True):
+        """
+        Map a compiled catalog file; the numeric columns stay memory-mapped.
+        verify checks the content hash (see catalog_store.read).
+        """
+        arrays, header = catalog_store.read(path, verify=verify)
+        strings = StringTable(catalog_store.decode_strings(arrays['string_offsets'], arrays['string_blob']))
+        columns = {field: arrays[f'col_{field}'] for field in cls.FIELDS}
+        table = cls(strings, columns, arrays['day_index'], arrays['start'], arrays['end'],
+                    arrays['capacity'])
+        table.content_hash = header['hash']
+        return table
+
+    def column_values(self, field):
+        """Decoded values of one text column, in row order."""
+        values = self.strings.values
+        return [values[code] for code in self.columns[field].tolist()]
+
+    def view(self, row):
+        course = object.__new__(Course)
+        course._table = self
+        course._row = row
+        return course
+
+    def views(self):
+        return [self.view(row) for row in range(len(self))]
+
+
+def _column(field):
+    i = CourseTable.FIELDS.index(field)
+
+    def get(self):
+        table = self._table
+        if table is None:
+            return self._row[i]
+        return table.strings.values[table.columns[field][self._row]]
+    return property(get)
+
+
+class Course:
+    """
+    One course meeting row.
+
+    Courses from a Catalog are views onto a CourseTable row (`_table`,
+    `_row`). Standalone ones, e.g. rebuilt from the session by from_dict,
+    keep their values in a plain tuple in `_row` with `_table` None, so
+    creating one costs no more than the old plain object.
+    """
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, name, program, instructor, id, room, day, time, comments, capacity=None):
+        self._table = None
+        self._row = (name, program, instructor, id, room, day, time, comments,
+                     DEFAULT_CAPACITY if capacity is None else capacity)
+
+    name = _column('name')
+    program = _column('program')
+    instructor = _column('instructor')
+    id = _column('id')
+    room = _column('room')
+    day = _column('day')
+    time = _column('time')
+    comments = _column('comments')
+
+    def _minutes(self):
+        """(start, end) minutes of the day, (-1, -1) when day/time cannot be parsed."""
+        try:
+            lo, hi = parse_slot(f"{self.day} {self.time}")
+        except ValueError:
+            return -1, -1
+        return lo % MINUTES_PER_DAY, hi - lo + lo % MINUTES_PER_DAY
+
+    @property
+    def start_minute(self):
+        if self._table is None:
+            return self._minutes()[0]
+        return int(self._table.start[self._row])
+
+    @property
+    def end_minute(self):
+        if self._table is None:
+            return self._minutes()[1]
+        return int(self._table.end[self._row])
+
+    @property
+    def capacity(self):
+        if self._table is None:
+            return self._row[-1]
+        return int(self._table.capacity[self._row])
+
+    def __reduce__(self):
+        # A view pickles as its own values, not the whole backing table
+        return Course, tuple(getattr(self, field) for field in CourseTable.FIELDS) + (self.capacity,)
+
+    def __str__(self):
+        return f"{self.name} - {self.instructor} - {self.id} | {self.time} | {self.day} | Room: {self.room}"
+
+    def to_dict(self):
+        table = self._table
+        if table is None:
+            return dict(zip(CourseTable.FIELDS, self._row))
+        values = table.strings.values
+        return {field: values[table.columns[field][self._row]] for field in CourseTable.FIELDS}
+
+    @staticmethod
+    def from_dict(data):
+        return Course(**data)
+
+    def __eq__(self, other):
+        return isinstance(other, Course) and self.id == other.id and self.day == other.day and self.time == other.time
+
+    def __hash__(self):
+        return hash((self.id, self.day, self.time))
+
+
+def normalize(s):
+        return " ".join(s.strip().split())
+
+
+HIGHLIGHT_COLORS = ["#f0f8ff", "#faebd7", "#98fb98", "#d3d3d3", "#ffb6c1", "#ffcccb"]
+
+
+class Catalog:
+    """
+    Immutable, indexed snapshot of one courses file.
+
+    Every index is built once when the file is loaded and exposed read-only
+    all the way down (mappings are MappingProxyType, sequences are tuples),
+    so the loader helpers below are plain lookups and the shared snapshot
+    cannot be changed through them.  ``version`` identifies the
+    file contents the snapshot was built from (path, mtime, size).
+    """
+
+    def __init__(self, table, version=None):
+        self.table = table
+        self.courses = tuple(table.views())
+        self.version = version
+
+        # Group on the interned codes; each distinct slot string is built once
+        values = table.strings.values
+        columns = {f: table.columns[f].tolist() for f in ('id', 'program', 'name', 'day', 'time')}
+        slot_names = {}
+        slot_by_row = []
+        by_id = defaultdict(list)
+        by_program = defaultdict(list)
+        by_name = defaultdict(list)
+        by_slot = defaultdict(list)
+        for row, course in enumerate(self.courses):
+            by_id[values[columns['id'][row]]].append(course)
+            by_program[values[columns['program'][row]]].append(course)
+            by_name[values[columns['name'][row]]].append(course)
+            key = (columns['day'][row], columns['time'][row])
+            slot = slot_names.get(key)
+            if slot is None:
+                slot = slot_names[key] = f"{normalize(values[key[0]])} {normalize(values[key[1]])}"
+            by_slot[slot].append(course)
+            slot_by_row.append(slot)
+
+        self.by_id = MappingProxyType({k: tuple(v) for k, v in by_id.items()})
+        self.by_program = MappingProxyType({k: tuple(v) for k, v in by_program.items()})
+        self.by_name = MappingProxyType({k: tuple(v) for k, v in by_name.items()})
+        self.by_slot = MappingProxyType({k: tuple(v) for k, v in by_slot.items()})
+        self.programs = tuple(self.by_program)
+
+        # program -> its distinct section ids / course names, in catalog order
+        self.program_sections = MappingProxyType(
+            {p: tuple(dict.fromkeys(c.id for c in rows)) for p, rows in self.by_program.items()})
+        self.program_courses = MappingProxyType(
+            {p: tuple(dict.fromkeys(c.name for c in rows)) for p, rows in self.by_program.items()})
+
+        # course name -> section ids (one entry per meeting row, as before)
+        self.name_to_ids = MappingProxyType(
+            {name: tuple(c.id for c in rows) for name, rows in self.by_name.items()})
+
+        # section id -> {'constraints': ("Day HH:MM-HH:MM", ...), 'course_name': name}
+        self.id_constraints = MappingProxyType({
+            cid: MappingProxyType({
+                'constraints': tuple(slot_by_row[c._row] for c in rows),
+                'course_name': rows[0].name,
+            })
+            for cid, rows in self.by_id.items()
+        })
+        self.id_times = MappingProxyType(
+            {cid: info['constraints'] for cid, info in self.id_constraints.items()})
+
+        # section id -> seats; a section holds as many as its smallest room row
+        self.id_capacity = MappingProxyType(
+            {cid: min(c.capacity for c in rows) for cid, rows in self.by_id.items()})
+
+        self.colors = MappingProxyType(
+            {cid: HIGHLIGHT_COLORS[i % len(HIGHLIGHT_COLORS)] for i, cid in enumerate(self.by_id)})
+
+        # program -> time -> day -> [Course], as rendered by schedule.html
+        schedules = {}
+        for program, rows in self.by_program.items():
+            grid = defaultdict(lambda: defaultdict(list))
+            for course in rows:
+                grid[course.time][course.day].append(course)
+            schedules[program] = MappingProxyType({
+                time: MappingProxyType({day: tuple(rows) for day, rows in days.items()})
+                for time, days in grid.items()
+            })
+        self.schedules = MappingProxyType(schedules)
+
+    @cached_property
+    def conflict_index(self):
+        """ConflictIndex over every section, built on first use."""
+        return ConflictIndex(self.id_constraints)
+
+
+_catalogs: Dict[str, Catalog] = {}
+_catalogs_lock = threading.Lock()
+_catalog_listeners = []
+
+
+def on_catalog_loaded(listener):
+    """
+    Register listener(catalog) to run whenever CourseDataLoader loads a new
+    catalog version (the first load included). Usable as a decorator.
+    """
+    _catalog_listeners.append(listener)
+    return listener
+
+
+class CourseDataLoader:
+    REQUIRED_FIELDS = {
+        'name': str,
+        'program': str,
+        'instructor': str,
+        'id': str,
+        'room': str,
+        'day': str,
+        'time': str,
+        'comments': str
+    }
+
+    def __init__(self, json_path):
+        self.json_path = json_path
+
+    @classmethod
+    def validate_record(cls, item, idx):
+        """One raw course row (JSON object or CSV row) -> a CourseTable record."""
+        validated = {}
+        for field, field_type in cls.REQUIRED_FIELDS.items():
+            value = (item.get(field) or "").strip()
+            if not isinstance(value, field_type):
+                value = field_type(value)
+            if field in ('day', 'time'):
+                value = value.replace(" ", "")
+            validated[field] = value
+        validated['capacity'] = cls._parse_capacity(item.get('capacity'), idx)
+        return validated
+
+    @property
+    def compiled_path(self):
+        """Where the compiled catalog for json_path lives (see ingest_catalog.py)."""
+        if self.json_path.endswith(CATALOG_SUFFIX):
+            return self.json_path
+        return os.path.splitext(self.json_path)[0] + CATALOG_SUFFIX
+
+    def _source_path(self):
+        """
+        The compiled catalog when it exists and is not older than the JSON
+        (or the JSON is gone); otherwise the JSON itself.
+        """
+        compiled = self.compiled_path
+        try:
+            compiled_mtime = os.stat(compiled).st_mtime_ns
+        except FileNotFoundError:
+            return self.json_path
+        try:
+            json_mtime = os.stat(self.json_path).st_mtime_ns
+        except FileNotFoundError:
+            return compiled
+        return compiled if compiled == self.json_path or compiled_mtime >= json_mtime else self.json_path
+
+    def _read_courses(self, path=None) -> CourseTable:
+        path = path or self.json_path
+        if path.endswith(CATALOG_SUFFIX):
+            # Runs once per (path, mtime, size) version, so hashing is cheap enough
+            return CourseTable.load(path, verify=True)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return CourseTable.from_records(self.validate_record(item, idx) for idx, item in enumerate(data))
+
+    @staticmethod
+    def _parse_capacity(value, idx):
+        """Optional seat count; blank or missing means DEFAULT_CAPACITY."""
+        if value is None or str(value).strip() == "":
+            return None
+        try:
+            seats = int(str(value).strip())
+        except ValueError:
+            raise ValueError(f"Course #{idx}: capacity must be an integer, got {value!r}")
+        if seats < 0:
+            raise ValueError(f"Course #{idx}: capacity must not be negative, got {seats}")
+        return seats
+
+    @property
+    def catalog(self) -> Catalog:
+        """
+        The process-wide Catalog for this file. It is loaded once, from the
+        compiled catalog when there is an up-to-date one, and rebuilt only
+        when the source file's mtime or size changes; each new version is
+        passed to the on_catalog_loaded listeners.
+        """
+        key = os.path.abspath(self.json_path)
+        path = os.path.abspath(self._source_path())
+        stat = os.stat(path)
+        version = (path, stat.st_mtime_ns, stat.st_size)
+
+        catalog = _catalogs.get(key)
+        if catalog is not None and catalog.version == version:
+            return catalog
+        loaded = False
+        with _catalogs_lock:
+            catalog = _catalogs.get(key)
+            if catalog is None or catalog.version != version:
+                catalog = _catalogs[key] = Catalog(self._read_courses(path), version)
+                loaded = True
+        if loaded:
+            for listener in _catalog_listeners:
+                listener(catalog)
+        return catalog
+
+    def load_courses(self) -> Tuple[Course, ...]:
+        return self.catalog.courses
+
+    def get_available_programs(self):
+        return list(self.catalog.programs)
+
+    def load_courses_by_program(self, program_name):
+        return list(self.catalog.by_program.get(program_name, ()))
+
+    def get_schedule(self, program_name):
+        return self.catalog.schedules.get(program_name, {})
+
+    def get_highlighted_course_ids(self):
+        return self.catalog.colors
+
+    def get_course_by_id(self, course_id):
+        return list(self.catalog.by_id.get(course_id, ()))
+
+    def get_course_id_mapping(self):
+        return self.catalog.by_id
+
+    def get_course_id_constraint_mapping(self):
+        return self.catalog.id_constraints
+
+    def get_course_name_to_ids_mapping(self):
+        """
+        Returns a dict mapping each course name to a list of course IDs that share that name.
+        """
+        return self.catalog.name_to_ids
+
+    def get_course_id_to_time_mapping(self):
+        return self.catalog.id_times
+
+    def get_course_id_capacity_mapping(self):
+        return self.catalog.id_capacity
+
+    def get_conflict_index(self):
+        return self.catalog.conflict_index
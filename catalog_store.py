@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+# File layout:
+#   MAGIC | uint32 format version | uint32 header length | JSON header | arrays
+# Each array starts on an ALIGN-byte boundary; the header records its dtype,
+# shape and offset, so a reader maps the file once and takes zero-copy views.
+MAGIC = b'SCHEDCAT'
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct('<8sII')
+
+
+def _aligned(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def content_hash(arrays):
+    """sha256 over every array's name, dtype, shape and bytes, in name order."""
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}|{array.dtype.str}|{array.shape}".encode('utf-8'))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def encode_strings(values):
+    """List of str -> (int64 offsets, uint8 UTF-8 blob); value i is blob[offsets[i]:offsets[i + 1]]."""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def decode_strings(offsets, blob):
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+
+
+def write(path, arrays, meta=None):
+    """
+    Write named numpy arrays (plus JSON-able `meta`) to path atomically.
+    Returns the content hash stored in the header.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    digest = content_hash(arrays)
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({
+        'format': FORMAT_VERSION, 'hash': digest, 'meta': meta or {}, 'arrays': layout,
+    }).encode('utf-8')
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+        # Readers that still map the old file keep their (unlinked) copy
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return digest
+
+
+def read(path, verify=True):
+    """
+    Map a file written by write(). Returns (arrays, header) where arrays are
+    read-only views onto the mapping. The prefix, header and file size are
+    always checked, sizes before anything is parsed; with verify the content hash is recomputed too, which
+    reads every page. A mismatch raises ValueError. verify=False is for
+    callers that have already checked this file (same path, mtime and size).
+    """
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    if len(mapped) < _PREFIX.size:
+        raise ValueError(f"{path}: not a compiled catalog")
+    magic, version, header_len = _PREFIX.unpack(mapped[:_PREFIX.size].tobytes())
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a compiled catalog")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: catalog format {version}, expected {FORMAT_VERSION}; recompile it")
+    if len(mapped) < _PREFIX.size + header_len:
+        raise ValueError(f"{path}: truncated catalog header ({len(mapped)} bytes, "
+                         f"expected at least {_PREFIX.size + header_len})")
+    try:
+        header = json.loads(mapped[_PREFIX.size:_PREFIX.size + header_len].tobytes())
+    except ValueError as e:  # JSONDecodeError and UnicodeDecodeError
+        raise ValueError(f"{path}: corrupt catalog header ({e})") from None
+    if not isinstance(header, dict) or not isinstance(header.get('arrays'), dict):
+        raise ValueError(f"{path}: corrupt catalog header")
+    data_start = _aligned(_PREFIX.size + header_len)
+    end = max((spec['offset'] + np.dtype(spec['dtype']).itemsize
+               * int(np.prod(spec['shape'], dtype=np.int64))
+               for spec in header['arrays'].values()), default=0)
+    if len(mapped) < data_start + end:
+        raise ValueError(f"{path}: truncated catalog ({len(mapped)} bytes, expected {data_start + end})")
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        start = data_start + spec['offset']
+        arrays[name] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+
+    if verify and content_hash(arrays) != header['hash']:
+        raise ValueError(f"{path}: content hash mismatch")
+    return arrays, header
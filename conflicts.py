@@ -0,0 +1,83 @@
+from timeslots import IntervalModel
+
+
+class ConflictIndex:
+    """
+    Precomputed conflict data for every section of a catalog.
+
+    Sections are compiled into an IntervalModel; each elementary stretch of
+    the week between two meeting boundaries is one bit, so a section id maps
+    to an integer mask and two sections overlap (even partially) exactly when
+    their masks share a bit.  On top of that, ``compatible[cid]`` is a
+    bitset over section *positions* holding every section that can sit in the
+    same schedule as ``cid``, which turns an AC-3 support check into one `&`.
+    """
+
+    def __init__(self, cid_constraints, intervals=None):
+        """
+        :cid_constraints: dict course_id -> {'constraints': [...], 'course_name': str}
+                          (the shape returned by get_course_id_constraint_mapping)
+        :intervals: IntervalModel for the same sections, if already compiled
+        """
+        self.intervals = intervals or IntervalModel.from_constraints(cid_constraints)
+        self.ids = list(self.intervals.keys)
+        self.position = self.intervals.position
+        self.masks = dict(zip(self.ids, self.intervals.segment_masks()))  # course_id -> segment mask
+
+        # course name -> its section ids in catalog order, in first-seen order
+        self.course_sections = {}
+        for cid in self.ids:
+            self.course_sections.setdefault(cid_constraints[cid]['course_name'], []).append(cid)
+
+        # Sections per segment, as a bitset over section positions
+        slot_sections = [0] * max(len(self.intervals.bounds) - 1, 0)
+        for pos, cid in enumerate(self.ids):
+            mask = self.masks[cid]
+            while mask:
+                low = mask & -mask
+                slot_sections[low.bit_length() - 1] |= 1 << pos
+                mask ^= low
+
+        # Pairwise-compatibility table: everything not sharing a slot with cid
+        everything = (1 << len(self.ids)) - 1
+        self.compatible = {}
+        for cid in self.ids:
+            clashing = 0
+            mask = self.masks[cid]
+            while mask:
+                low = mask & -mask
+                clashing |= slot_sections[low.bit_length() - 1]
+                mask ^= low
+            self.compatible[cid] = everything & ~clashing
+
+    def conflicts(self, a, b):
+        """True if sections a and b overlap in time."""
+        return bool(self.masks[a] & self.masks[b])
+
+    def slot_mask(self, slots):
+        """Mask of every segment the given slot strings overlap."""
+        return self.intervals.mask_of(slots)
+
+    def bits_of(self, cids):
+        """Bitset over section positions for an iterable of course ids."""
+        bits = 0
+        for cid in cids:
+            bits |= 1 << self.position[cid]
+        return bits
+
+    def clash_bits(self, cids):
+        """Bitset of every section that overlaps at least one of cids."""
+        everything = (1 << len(self.ids)) - 1
+        bits = 0
+        for cid in cids:
+            bits |= everything & ~self.compatible[cid]
+        return bits
+
+    def ids_of(self, bits):
+        """Course ids whose positions are set in bits, in catalog order."""
+        out = []
+        while bits:
+            low = bits & -bits
+            out.append(self.ids[low.bit_length() - 1])
+            bits ^= low
+        return out
@@ -0,0 +1,282 @@
+from collections import deque
+
+from ac3 import AC3
+from tracing import Tracer, OFF, SUMMARY, ARC
+
+_MISSING = object()
+
+
+class IncrementalAC3:
+    """
+    Arc-consistent domains for one catalog and program that follow a user's
+    picks and no-class slots as they are added and removed, instead of being
+    rebuilt for every solve.
+
+    The state starts from the arc-consistent domains with no constraints, as
+    bitsets over the ConflictIndex's section positions. On top of those sits
+    a stack of frames: one per no-class slot, and one per course with picked
+    sections. Pushing a frame narrows the domains it touches and propagates
+    from the variables it narrowed. Every domain it changes goes on a trail
+    (as in ScheduleSearch), so popping the frame restores the earlier state
+    exactly. sync() pops back to the first frame that no longer holds,
+    re-pushes the ones above it that still do, and pushes whatever is new:
+    adding a constraint costs one push, removing one costs the frames above
+    it.
+
+    Propagation is AC-3 over variables rather than arcs. The sections that
+    have a support in a variable are the OR of its values' compatibility
+    bitsets, so revising every neighbour against it is one `&` each.
+    Constraints only ever narrow the domains, so this reaches the same
+    fixpoint a cold AC3 does for the same inputs. solver() hands the result
+    to a plain AC3 in the cold solver's variable order, so searches, cursors
+    and pages come out the same too.
+    """
+
+    def __init__(self, base, tracer=None):
+        """
+        :base: AC3 built without picks or no-class slots (see from_loader);
+               its initial domains, constraint graph and scope are the
+               starting point
+        :tracer: Tracer for propagation counters; solver() swaps in its own
+        """
+        self.base = base
+        self.index = base.index
+        self.cid_constraints = base.cid_constraints
+        self.tracer = tracer or Tracer(OFF)
+        self.compatible_at = [self.index.compatible[cid] for cid in self.index.ids]
+
+        self.domains = {name: self.index.bits_of(ids) for name, ids in base.domains.items()}
+        self.neighbors = dict(base.neighbors)
+        self.frames = []        # (frame, trail length before it)
+        self._trail = []        # (attribute, key, previous value or _MISSING)
+        self._supports = {}     # var -> (domain bits, sections supported by them)
+        self._blocked = {}      # (day, time) -> sections meeting in that slot
+
+        # Sections each base variable may take before any constraint, which
+        # the cold solver orders its variables by
+        self._scoped = {}
+        for name in self.domains:
+            sections = self.index.course_sections[name]
+            if base.section_ids is not None:
+                sections = [cid for cid in sections if cid in base.section_ids]
+            self._scoped[name] = self.index.bits_of(sections)
+
+        with self.tracer.phase("ac3"):
+            if all(self.domains.values()):
+                self._propagate(list(self.domains))
+        self._trail.clear()     # the base state is never undone
+
+    @classmethod
+    def from_loader(cls, course_loader, program=None, tracer=None, **kwargs):
+        """State over a CourseDataLoader's catalog, scoped to program as in AC3.from_loader."""
+        base = AC3.from_loader(course_loader, program=program, tracer=Tracer(OFF), **kwargs)
+        return cls(base, tracer=tracer)
+
+    # ——— constraints ———
+
+    def _target_frames(self, picks, no_class):
+        """Frames for these constraints: no-class slots first, then picked courses."""
+        masks = self.index.masks
+        forbidden = self.index.slot_mask(f"{day} {time}" for day, time in no_class)
+        picked = {}
+        for cid in picks:
+            info = self.cid_constraints.get(cid)
+            # A pick inside a no-class slot is skipped, as in AC3._init_domains
+            if info and not masks[cid] & forbidden:
+                picked.setdefault(info['course_name'], set()).add(cid)
+        frames = [('no_class', nc) for nc in dict.fromkeys(tuple(nc) for nc in no_class)]
+        frames += [('pick', name, frozenset(ids)) for name, ids in picked.items()]
+        return frames
+
+    def sync(self, picks, no_class):
+        """
+        Bring the state to the given picked section ids and (day, time)
+        no-class slots. Returns (frames pushed, frames popped).
+        """
+        target = self._target_frames(picks, no_class)
+        wanted = set(target)
+        keep = 0
+        while keep < len(self.frames) and self.frames[keep][0] in wanted:
+            keep += 1
+        replay = [frame for frame, _ in self.frames[keep:] if frame in wanted]
+        popped = len(self.frames) - keep
+        while len(self.frames) > keep:
+            self._pop()
+
+        held = {frame for frame, _ in self.frames}
+        held.update(replay)
+        pushes = replay + [frame for frame in target if frame not in held]
+        for frame in pushes:
+            self._push(frame)
+        if pushes or popped:
+            self.tracer.emit(SUMMARY,
+                f"Solver state updated: {len(pushes)} constraint(s) applied, "
+                f"{popped} undone ({len(replay)} of them re-applied)"
+            )
+        return len(pushes), popped
+
+    def _push(self, frame):
+        """Narrow the domains for one frame and propagate from what changed."""
+        wiped = not all(self.domains.values())
+        self.frames.append((frame, len(self._trail)))
+        changed = []
+        if frame[0] == 'no_class':
+            blocked = self._slot_sections(frame[1])
+            for name, dom in self.domains.items():
+                if dom & blocked:
+                    self._set('domains', name, dom & ~blocked)
+                    changed.append(name)
+        else:
+            _, name, ids = frame
+            bits = self.index.bits_of(ids)
+            dom = self.domains.get(name)
+            if dom is None:
+                # A course outside the program becomes a variable once picked
+                self._add_variable(name, bits)
+                changed.append(name)
+            elif dom & ~bits:
+                self._set('domains', name, dom & bits)
+                changed.append(name)
+
+        if changed and not wiped and all(self.domains[name] for name in changed):
+            with self.tracer.phase("ac3"):
+                self._propagate(changed)
+
+    def _slot_sections(self, slot):
+        """Bitset of the sections that meet during a (day, time) no-class slot."""
+        bits = self._blocked.get(slot)
+        if bits is None:
+            day, time = slot
+            forbidden = self.index.slot_mask([f"{day} {time}"])
+            masks = self.index.masks
+            bits = self.index.bits_of(cid for cid in self.index.ids if masks[cid] & forbidden)
+            self._blocked[slot] = bits
+        return bits
+
+    def _pop(self):
+        """Undo the top frame."""
+        _, mark = self.frames.pop()
+        trail = self._trail
+        while len(trail) > mark:
+            attr, key, previous = trail.pop()
+            store = getattr(self, attr)
+            if previous is _MISSING:
+                del store[key]
+            else:
+                store[key] = previous
+
+    def _set(self, attr, key, value):
+        store = getattr(self, attr)
+        self._trail.append((attr, key, store.get(key, _MISSING)))
+        store[key] = value
+
+    def _add_variable(self, name, bits):
+        """New variable with its constraint-graph edges, all on the trail."""
+        clashes = self.index.clash_bits(self.index.ids_of(bits))
+        linked = [other for other, dom in self.domains.items() if clashes & dom]
+        self._set('domains', name, bits)
+        self._set('neighbors', name, linked)
+        for other in linked:
+            self._set('neighbors', other, self.neighbors[other] + [name])
+
+    # ——— propagation ———
+
+    def _support(self, var):
+        """Every section compatible with at least one value of var."""
+        bits = self.domains[var]
+        cached = self._supports.get(var)
+        if cached is None or cached[0] != bits:
+            union = 0
+            rest = bits
+            while rest:
+                low = rest & -rest
+                union |= self.compatible_at[low.bit_length() - 1]
+                rest ^= low
+            cached = self._supports[var] = (bits, union)
+        return cached[1]
+
+    def _propagate(self, changed):
+        """
+        Re-establish arc consistency after the domains in `changed` shrank.
+        Stops at the first wipe-out and returns False.
+        """
+        tracer = self.tracer
+        queue = deque(changed)
+        queued = set(changed)
+        while queue:
+            xi = queue.popleft()
+            queued.discard(xi)
+            support = self._support(xi)
+            tracer.count("arcs", len(self.neighbors[xi]))
+            for xk in self.neighbors[xi]:
+                dom = self.domains[xk]
+                new = dom & support
+                if new == dom:
+                    continue
+                self._set('domains', xk, new)
+                tracer.count("values_pruned", bin(dom ^ new).count("1"))
+                if tracer.level >= ARC:
+                    tracer.emit(ARC, f"Pruned {self.index.ids_of(dom ^ new)} from {xk} "
+                                     f"(no support in {xi})")
+                if not new:
+                    tracer.emit(SUMMARY, "A course has no valid section left; no schedule exists.")
+                    return False
+                if xk not in queued:
+                    queue.append(xk)
+                    queued.add(xk)
+        return True
+
+    @property
+    def nbytes(self):
+        """Rough memory footprint: the domains and the trail are section bitsets."""
+        bitset = 64 + len(self.index.ids) // 8
+        return 1024 + bitset * (2 * len(self.domains) + len(self._trail))
+
+    # ——— search ———
+
+    def ordered_domains(self, picks=()):
+        """
+        The current domains as lists of section ids, in the cold solver's
+        variable order (see AC3._init_domains): courses by how many sections
+        the picks and no-class slots leave them, picked courses first among
+        equals in the order of `picks`. Empty when some course has no section left.
+        """
+        if not all(self.domains.values()):
+            return {}
+        picked = {}
+        blocked = 0
+        for frame, _ in self.frames:
+            if frame[0] == 'no_class':
+                blocked |= self._slot_sections(frame[1])
+            else:
+                picked[frame[1]] = len(frame[2])
+
+        names = []
+        for cid in picks:
+            info = self.cid_constraints.get(cid)
+            if info and info['course_name'] in picked and info['course_name'] not in names:
+                names.append(info['course_name'])
+        names += [name for name in self.index.course_sections
+                  if name in self.domains and name not in picked]
+
+        def size(name):
+            if name in picked:
+                return picked[name]
+            return bin(self._scoped[name] & ~blocked).count("1")
+
+        return {name: self.index.ids_of(self.domains[name]) for name in sorted(names, key=size)}
+
+    def solver(self, picks, no_class, tracer=None):
+        """
+        Sync to the given constraints and return a plain AC3 over the
+        resulting domains, ready to search. The AC3 gets its own copy of the
+        domains, so it stays valid while this state keeps changing.
+        """
+        if tracer is not None:
+            self.tracer = tracer
+        with self.tracer.phase("sync"):
+            self.sync(picks, no_class)
+            domains = self.ordered_domains(picks)
+        base = self.base
+        return AC3(base.courses, self.cid_constraints, conflict_index=self.index,
+                   tracer=self.tracer, propagation=base.propagation, domains=domains)
@@ -0,0 +1,206 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from ac3 import AC3
+from catalog import CourseDataLoader
+from pso import make_pso
+from tracing import Tracer, OFF
+
+
+# Most solutions an AC-3 job keeps when its params give no max_solutions;
+# every one is held as a proxied dict in the manager process
+DEFAULT_MAX_SOLUTIONS = 1000
+
+# Seconds between two looks at a running job's cancel flag
+CANCEL_POLL = 0.2
+
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when every worker is busy and the queue is full."""
+
+
+# ——— Worker entry points (run inside the pool's processes) ———
+
+def run_ac3_job(params, progress, solutions, cancel):
+    """
+    Enumerate AC-3 schedules, streaming them into the shared `solutions`
+    list in batches. `params`: json_path, program, picks, no_class,
+    max_solutions (DEFAULT_MAX_SOLUTIONS when missing). `truncated` in the
+    result says whether enumeration stopped at that cap. The search polls
+    `cancel` every CANCEL_POLL seconds, so a long stretch without
+    solutions can still be cancelled.
+    """
+    limit = params.get('max_solutions') or DEFAULT_MAX_SOLUTIONS
+    loader = CourseDataLoader(params['json_path'])
+    ac3_algo = AC3.from_loader(loader, params.get('picks', ()), params.get('no_class', ()),
+                               program=params.get('program'), tracer=Tracer(OFF))
+    checked = time.monotonic()
+
+    def cancelled():
+        # Called every few hundred search nodes; the event lives in the
+        # manager process, so only ask it on a timer
+        nonlocal checked
+        if time.monotonic() - checked < CANCEL_POLL:
+            return False
+        checked = time.monotonic()
+        return cancel.is_set()
+
+    batch = []
+    flushed = time.monotonic()
+    count = 0
+    for sol in ac3_algo.iter_solutions(limit=limit, stop=cancelled):
+        batch.append(sol)
+        count += 1
+        if len(batch) >= 50 or time.monotonic() - flushed > 0.5:
+            solutions.extend(batch)
+            progress['solutions'] = count
+            batch = []
+            flushed = time.monotonic()
+            if cancel.is_set():
+                return {'cancelled': True, 'solutions': count, 'truncated': False}
+    solutions.extend(batch)
+    progress['solutions'] = count
+    if cancel.is_set():
+        return {'cancelled': True, 'solutions': count, 'truncated': False}
+    return {'cancelled': False, 'solutions': count, 'truncated': count >= limit}
+
+
+def run_pso_job(params, progress, solutions, cancel):
+    """Run a PSO on `params` (make_pso kwargs), publishing best-so-far fitness."""
+    pso = make_pso(**params)
+
+    def report(iteration, best_fitness):
+        progress['iteration'] = iteration
+        progress['best_fitness'] = float(best_fitness)
+        return cancel.is_set()
+
+    best_position, best_fitness, history = pso.run(callback=report)
+    return {
+        'cancelled': cancel.is_set(),
+        'best_position': best_position.tolist(),
+        'best_fitness': float(best_fitness),
+        'history': history.tolist(),
+        'stop_reason': pso.stop_reason,
+        'island_stats': getattr(pso, 'island_stats', None),
+    }
+
+
+WORKERS = {'ac3': run_ac3_job, 'pso': run_pso_job}
+
+
+class JobManager:
+    """
+    Background solver jobs on a bounded process pool.
+
+    `submit` returns a job id straight away; the web layer polls `status`
+    for progress and partial results and may `cancel` a job. At most
+    `max_workers + max_queued` jobs are in flight; beyond that `submit`
+    raises JobQueueFull so callers can push back (HTTP 429). Finished jobs
+    are kept for `ttl` seconds.
+    """
+
+    def __init__(self, max_workers=2, max_queued=8, ttl=3600):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._manager = None
+
+    def _ensure_pool(self):
+        # Started lazily, with spawn so workers never inherit the server's threads
+        if self._pool is None:
+            context = multiprocessing.get_context('spawn')
+            self._manager = context.Manager()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def submit(self, kind, params):
+        worker = WORKERS[kind]
+        with self._lock:
+            self._expire()
+            active = sum(1 for job in self._jobs.values() if not job['future'].done())
+            if active >= self.max_workers + self.max_queued:
+                raise JobQueueFull(f"{active} jobs already queued or running")
+            self._ensure_pool()
+
+            job_id = uuid.uuid4().hex
+            progress = self._manager.dict()
+            solutions = self._manager.list()
+            cancel = self._manager.Event()
+            future = self._pool.submit(worker, params, progress, solutions, cancel)
+            self._jobs[job_id] = {
+                'kind': kind, 'params': params, 'future': future, 'progress': progress,
+                'solutions': solutions, 'cancel': cancel,
+                'submitted': time.time(), 'finished': None,
+            }
+            future.add_done_callback(lambda _f, job=self._jobs[job_id]: job.update(finished=time.time()))
+        return job_id
+
+    def get(self, job_id):
+        """The raw job record (kind, params, future, ...), or None."""
+        self.expire()
+        return self._jobs.get(job_id)
+
+    def status(self, job_id, offset=0, limit=100):
+        """
+        State plus partial results: best-so-far fitness for PSO, a window
+        of the solutions found so far for AC-3. None for unknown jobs.
+        """
+        self.expire()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job['future']
+        info = {'id': job_id, 'kind': job['kind'], 'progress': dict(job['progress'])}
+
+        if future.cancelled():
+            info['state'] = 'cancelled'
+        elif future.done():
+            try:
+                result = future.result()
+            except CancelledError:
+                info['state'] = 'cancelled'
+            except Exception as e:
+                info['state'] = 'failed'
+                info['error'] = str(e)
+            else:
+                info['state'] = 'cancelled' if result.get('cancelled') else 'done'
+                info['result'] = result
+        elif future.running():
+            info['state'] = 'running'
+        else:
+            info['state'] = 'queued'
+
+        if job['kind'] == 'ac3':
+            info['solutions'] = list(job['solutions'][offset:offset + limit])
+        return info
+
+    def cancel(self, job_id):
+        """Cancel a queued job outright, or ask a running one to stop."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if not job['future'].cancel():
+            job['cancel'].set()
+        return True
+
+    def expire(self):
+        """Forget jobs that finished more than `ttl` seconds ago."""
+        with self._lock:
+            self._expire()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [k for k, job in self._jobs.items()
+                       if job['finished'] is not None and job['finished'] < cutoff]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._manager.shutdown()
+            self._pool = self._manager = None
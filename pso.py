@@ -1,16 +1,27 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
 import numpy as np
-import random
+from timeslots import IntervalModel
 
 class BinaryPSO:
     def __init__(self, num_students, num_courses, num_particles, max_iterations,
                  inertia_weight, cognitive_coefficient, social_coefficient,
                  student_preferences, course_times, course_labels, course_caps,
                  preference_weight=1, time_weight=3, label_weight=4, capacity_weight=2,
-                 course_load_weight=5, seed=None):
-        # ——— Seed everything for reproducibility ———
-        if seed is not None:
-            np.random.seed(seed)
-            random.seed(seed)
+                 course_load_weight=5, seed=None, target_fitness=0, patience=None,
+                 time_budget=None, min_diversity=None):
+        """
+        Stopping criteria (each None to disable); run() stops at the first hit:
+        :target_fitness: stop once the best fitness is <= this (0 is a perfect schedule)
+        :patience: stop after this many iterations without improving the best
+        :time_budget: stop after this many seconds of wall-clock time
+        :min_diversity: stop once swarm diversity (see diversity()) drops below this
+        """
+        # ——— One seeded generator drives every random draw ———
+        self.rng = np.random.default_rng(seed)
 
         self.num_students = num_students
         self.num_courses = num_courses
@@ -28,67 +39,72 @@ class BinaryPSO:
         self.label_weight = label_weight
         self.capacity_weight = capacity_weight
         self.course_load_weight = course_load_weight
+        self.target_fitness = target_fitness
+        self.patience = patience
+        self.time_budget = time_budget
+        self.min_diversity = min_diversity
+        self.history = np.empty(0)
+        self.stop_reason = None
         self.unique_labels = set(course_labels)
 
+        # Meeting times parsed once; clash_counts[a, b] = overlapping meeting pairs
+        self.intervals = IntervalModel(range(num_courses), course_times)
+        self.clash_counts = self.intervals.overlap_counts()
+
+        self._compile_fitness_terms()
+        self._init_swarm()
+
+    def _init_swarm(self):
         # Initialize positions & velocities
-        self.binary_table = np.random.randint(0, 2, 
-            (num_particles, num_students, num_courses))
-        self.velocities = np.random.uniform(-1, 1, 
-            (num_particles, num_students, num_courses))
+        shape = (self.num_particles, self.num_students, self.num_courses)
+        self.binary_table = self.rng.integers(0, 2, shape)
+        self.velocities = self.rng.uniform(-1, 1, shape)
 
-        # Bests
+        # Bests; personal-best fitness is cached so only moved particles are re-scored
         self.personal_best_positions = self.binary_table.copy()
+        self.personal_best_fitness = self.evaluate(self.personal_best_positions)
         self.global_best_position = self.binary_table[0].copy()
         self.global_best_fitness = float('inf')
 
-    def fitness_function(self, particle):
-        preference_clashes = 0
-        time_clashes = 0
-        label_clashes = 0
-        capacity_clashes = 0
-        course_load_penalty = 0
-
-        for student_id in range(self.num_students):
-            selected_courses = np.where(particle[student_id] == 1)[0]
-            student_prefs = self.student_preferences[student_id]
-            enrolled_labels = set()
-
-            # Preference & collect labels
-            for course_id in selected_courses:
-                if course_id not in student_prefs:
-                    preference_clashes += 1
-                enrolled_labels.add(self.course_labels[course_id])
-
-            # Time clashes
-            for i in range(len(selected_courses)):
-                for j in range(i+1, len(selected_courses)):
-                    times_i = self.course_times[selected_courses[i]]
-                    times_j = self.course_times[selected_courses[j]]
-                    for day_i, s_i, e_i in times_i:
-                        for day_j, s_j, e_j in times_j:
-                            if day_i == day_j and (s_i < e_j and e_i > s_j):
-                                time_clashes += 1
-
-            # Label clashes
-            label_counts = {}
-            for cid in selected_courses:
-                lab = self.course_labels[cid]
-                label_counts[lab] = label_counts.get(lab, 0) + 1
-            for count in label_counts.values():
-                if count > 1:
-                    label_clashes += count - 1
-
-            # Course load penalty
-            num_unique = len(enrolled_labels)
-            total_unique = len(self.unique_labels)
-            if num_unique < total_unique:
-                course_load_penalty += (total_unique - num_unique)
-
-        # Capacity clashes
-        for cid in range(self.num_courses):
-            enrolled = np.sum(particle[:, cid])
-            if enrolled > self.course_caps[cid]:
-                capacity_clashes += (enrolled - self.course_caps[cid])
+    def _compile_fitness_terms(self):
+        """Constant matrices the batched evaluator contracts positions against."""
+        # preference_mask[s, c]: course c is on student s's list
+        self.preference_mask = np.zeros((self.num_students, self.num_courses), dtype=bool)
+        for student_id, prefs in enumerate(self.student_preferences):
+            prefs = [c for c in prefs if 0 <= c < self.num_courses]
+            self.preference_mask[student_id, prefs] = True
+
+        # label_onehot[c, l]: course c carries label l
+        labels = sorted(self.unique_labels)
+        label_index = {lab: i for i, lab in enumerate(labels)}
+        self.label_onehot = np.zeros((self.num_courses, len(labels)))
+        self.label_onehot[np.arange(self.num_courses),
+                          [label_index[lab] for lab in self.course_labels]] = 1
+
+        self.caps = np.asarray(self.course_caps)
+        self.clash_weights = self.clash_counts.astype(np.float64)
+
+    def evaluate(self, positions):
+        """
+        Fitness of a batch of positions shaped (particles, students, courses);
+        returns one value per particle.
+        """
+        x = positions.astype(np.float64)
+
+        # Preference: enrolled in a course that is not on the student's list
+        preference_clashes = np.sum(positions & ~self.preference_mask, axis=(1, 2))
+
+        # Time: overlapping meetings over enrolled course pairs, x·C·xᵀ / 2
+        time_clashes = np.rint(np.einsum('psc,psc->p', x @ self.clash_weights, x) / 2).astype(np.int64)
+
+        # Labels: per-student label counts; repeats clash, missing ones add load
+        label_counts = x @ self.label_onehot
+        label_clashes = np.sum(np.maximum(label_counts - 1, 0), axis=(1, 2))
+        course_load_penalty = np.sum(label_counts == 0, axis=(1, 2))
+
+        # Capacity: enrolment over each course's cap
+        enrolled = positions.sum(axis=1)
+        capacity_clashes = np.sum(np.maximum(enrolled - self.caps, 0), axis=1)
 
         return (
             self.preference_weight * preference_clashes +
@@ -98,44 +114,466 @@ class BinaryPSO:
             self.course_load_weight* course_load_penalty
         )
 
+    def fitness_function(self, particle):
+        return self.evaluate(particle[None])[0]
+
     def update_velocities(self):
-        for i in range(self.num_particles):
-            for j in range(self.num_students):
-                for k in range(self.num_courses):
-                    r1 = random.random()
-                    r2 = random.random()
-                    self.velocities[i,j,k] = (
-                        self.inertia_weight  * self.velocities[i,j,k]
-                      + self.cognitive_coefficient * r1 * (self.personal_best_positions[i,j,k] - self.binary_table[i,j,k])
-                      + self.social_coefficient    * r2 * (self.global_best_position[j,k]       - self.binary_table[i,j,k])
-                    )
+        # Whole-swarm update: v = w·v + c1·r1·(pbest − x) + c2·r2·(gbest − x)
+        shape = self.velocities.shape
+        r1 = self.rng.random(shape)
+        r2 = self.rng.random(shape)
+        self.velocities *= self.inertia_weight
+        self.velocities += self.cognitive_coefficient * r1 * (self.personal_best_positions - self.binary_table)
+        self.velocities += self.social_coefficient * r2 * (self.global_best_position[None] - self.binary_table)
 
     def update_positions(self):
-        for i in range(self.num_particles):
-            for j in range(self.num_students):
-                for k in range(self.num_courses):
-                    sigmoid = 1 / (1 + np.exp(-self.velocities[i,j,k]))
-                    self.binary_table[i,j,k] = 1 if random.random() < sigmoid else 0
+        # x = 1 with probability sigmoid(v)
+        sigmoid = 1 / (1 + np.exp(-self.velocities))
+        self.binary_table[...] = self.rng.random(self.velocities.shape) < sigmoid
 
     def update_personal_and_global_best(self):
-        for i in range(self.num_particles):
-            fitness_current = self.fitness_function(self.binary_table[i])
-            fitness_personal = self.fitness_function(self.personal_best_positions[i])
+        fitness_current = self.evaluate(self.binary_table)
+
+        improved = fitness_current < self.personal_best_fitness
+        self.personal_best_positions[improved] = self.binary_table[improved]
+        self.personal_best_fitness[improved] = fitness_current[improved]
+
+        best = int(np.argmin(fitness_current))
+        if fitness_current[best] < self.global_best_fitness:
+            self.global_best_fitness = fitness_current[best]
+            self.global_best_position = self.binary_table[best].copy()
+
+    def diversity(self):
+        """
+        Mean over (student, course) bits of 4·p·(1 − p), where p is the share
+        of particles with the bit set: 1 when every bit splits the swarm in
+        half, 0 once all particles sit on the same position.
+        """
+        p = self.binary_table.mean(axis=0)
+        return float(np.mean(4 * p * (1 - p)))
 
-            if fitness_current < fitness_personal:
-                self.personal_best_positions[i] = self.binary_table[i].copy()
+    def _stop_reason(self, iteration, stale, started):
+        if self.target_fitness is not None and self.global_best_fitness <= self.target_fitness:
+            return 'target'
+        if self.patience is not None and stale >= self.patience:
+            return 'patience'
+        if self.time_budget is not None and time.perf_counter() - started >= self.time_budget:
+            return 'time'
+        if self.min_diversity is not None and self.diversity() < self.min_diversity:
+            return 'diversity'
+        if iteration == self.max_iterations:
+            return 'max_iterations'
+        return None
 
-            if fitness_current < self.global_best_fitness:
-                self.global_best_fitness = fitness_current
-                self.global_best_position = self.binary_table[i].copy()
+    def run(self, callback=None):
+        """
+        Iterate until max_iterations or a stopping criterion is met.
 
-    def run(self):
-        for itr in range(self.max_iterations):
+        :callback: optional callable(iteration, best_fitness), called after
+                   every iteration; returning True stops the run early
+        Returns (best_position, best_fitness, history), where history[i] is
+        the best fitness after iteration i + 1. `stop_reason` says why the
+        run ended.
+        """
+        history = []
+        started = time.perf_counter()
+        best = self.global_best_fitness
+        stale = 0
+        self.stop_reason = None
+        for itr in range(1, self.max_iterations + 1):
             self.update_velocities()
             self.update_positions()
             self.update_personal_and_global_best()
-            print(f"Iter {itr+1}/{self.max_iterations}, Best Fitness: {self.global_best_fitness}")
-        return self.global_best_position, self.global_best_fitness
+            history.append(self.global_best_fitness)
+
+            if self.global_best_fitness < best:
+                best = self.global_best_fitness
+                stale = 0
+            else:
+                stale += 1
+
+            if callback is not None and callback(itr, self.global_best_fitness):
+                self.stop_reason = 'callback'
+            else:
+                self.stop_reason = self._stop_reason(itr, stale, started)
+            if self.stop_reason is not None:
+                break
+
+        self.history = np.asarray(history, dtype=np.float64)
+        return self.global_best_position, self.global_best_fitness, self.history
 
     def get_results(self):
         return self.global_best_position, self.global_best_fitness
+
+
+class CompactBinaryPSO(BinaryPSO):
+    """
+    Memory-lean BinaryPSO for large cohorts.
+
+    Only candidate enrolments are represented: with restrict_to_preferences
+    a student's candidates are the courses on their preference list,
+    otherwise every course. They are laid out CSR-style, so student s owns
+    entries indptr[s]:indptr[s + 1] and entry e is course indices[e].
+    Positions are rows of bit-packed uint8 over the entries and velocities
+    are float32, so memory scales with particles × candidate enrolments
+    instead of particles × students × courses. `global_best_position` is
+    still returned as a dense students × courses array.
+    """
+
+    def __init__(self, *args, restrict_to_preferences=True, **kwargs):
+        self.restrict_to_preferences = restrict_to_preferences
+        super().__init__(*args, **kwargs)
+
+    def _compile_fitness_terms(self):
+        labels = sorted(self.unique_labels)
+        label_index = {lab: i for i, lab in enumerate(labels)}
+        label_of = np.array([label_index[lab] for lab in self.course_labels], dtype=np.int64)
+        self.num_labels = len(labels)
+
+        # CSR rows; within a student, entries are grouped by label
+        rows, preferred = [], []
+        for prefs in self.student_preferences:
+            wanted = {c for c in prefs if 0 <= c < self.num_courses}
+            courses = wanted if self.restrict_to_preferences else range(self.num_courses)
+            row = sorted(courses, key=lambda c: (label_of[c], c))
+            rows.append(row)
+            preferred.extend(c in wanted for c in row)
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.indices = np.array([c for row in rows for c in row], dtype=np.int64)
+        self.student_of = np.repeat(np.arange(self.num_students), lengths)
+        self.entry_preferred = np.array(preferred, dtype=bool)
+        self.num_entries = len(self.indices)
+
+        # (student, label) groups are contiguous runs of entries
+        group = self.student_of * self.num_labels + label_of[self.indices]
+        self.label_starts = _run_starts(group)
+
+        # Entries sorted by course give one run per course with candidates
+        self.course_order = np.argsort(self.indices, kind='stable')
+        by_course = self.indices[self.course_order]
+        self.course_starts = _run_starts(by_course)
+        self.caps = np.asarray(self.course_caps)[by_course[self.course_starts]]
+
+        # Clashing entry pairs inside each student's row, with their overlap counts
+        pair_a, pair_b = [], []
+        for s, row in enumerate(rows):
+            if len(row) < 2:
+                continue
+            i, j = np.nonzero(np.triu(self.clash_counts[np.ix_(row, row)], k=1))
+            pair_a.append(i + self.indptr[s])
+            pair_b.append(j + self.indptr[s])
+        self.pair_a = np.concatenate(pair_a) if pair_a else np.zeros(0, dtype=np.int64)
+        self.pair_b = np.concatenate(pair_b) if pair_b else np.zeros(0, dtype=np.int64)
+        self.pair_weights = self.clash_counts[self.indices[self.pair_a],
+                                              self.indices[self.pair_b]].astype(np.int64)
+
+    def _init_swarm(self):
+        shape = (self.num_particles, self.num_entries)
+        self.binary_table = np.packbits(self.rng.integers(0, 2, shape, dtype=np.uint8), axis=1)
+        self.velocities = self.rng.random(shape, dtype=np.float32)
+        self.velocities *= 2
+        self.velocities -= 1
+
+        self.personal_best_positions = self.binary_table.copy()
+        self.personal_best_fitness = self.evaluate(self.unpack(self.personal_best_positions))
+        self.global_best_bits = self.binary_table[0].copy()
+        self.global_best_fitness = float('inf')
+
+    def unpack(self, packed):
+        """Packed rows -> uint8 0/1 arrays over the candidate entries."""
+        return np.unpackbits(packed, axis=-1, count=self.num_entries)
+
+    @property
+    def global_best_position(self):
+        dense = np.zeros((self.num_students, self.num_courses), dtype=np.int64)
+        dense[self.student_of, self.indices] = self.unpack(self.global_best_bits)
+        return dense
+
+    def evaluate(self, positions):
+        """
+        Fitness of unpacked positions shaped (particles, entries); same
+        terms and weights as BinaryPSO.evaluate.
+        """
+        preference_clashes = np.sum(positions & ~self.entry_preferred, axis=1)
+
+        time_clashes = (positions[:, self.pair_a] & positions[:, self.pair_b]) @ self.pair_weights
+
+        label_counts = _run_sums(positions, self.label_starts)
+        label_clashes = np.sum(np.maximum(label_counts - 1, 0), axis=1)
+        course_load_penalty = (self.num_students * self.num_labels
+                               - np.count_nonzero(label_counts, axis=1))
+
+        enrolled = _run_sums(positions[:, self.course_order], self.course_starts)
+        capacity_clashes = np.sum(np.maximum(enrolled - self.caps, 0), axis=1)
+
+        return (
+            self.preference_weight * preference_clashes +
+            self.time_weight       * time_clashes       +
+            self.label_weight      * label_clashes      +
+            self.capacity_weight   * capacity_clashes   +
+            self.course_load_weight* course_load_penalty
+        )
+
+    def fitness_function(self, particle):
+        """:particle: 0/1 vector over the candidate entries"""
+        return self.evaluate(np.asarray(particle, dtype=np.uint8)[None])[0]
+
+    def update_velocities(self):
+        shape = self.velocities.shape
+        x = self.unpack(self.binary_table)
+        r1 = self.rng.random(shape, dtype=np.float32)
+        r2 = self.rng.random(shape, dtype=np.float32)
+        self.velocities *= np.float32(self.inertia_weight)
+        r1 *= np.float32(self.cognitive_coefficient)
+        r1 *= np.subtract(self.unpack(self.personal_best_positions), x, dtype=np.float32)
+        self.velocities += r1
+        r2 *= np.float32(self.social_coefficient)
+        r2 *= np.subtract(self.unpack(self.global_best_bits)[None], x, dtype=np.float32)
+        self.velocities += r2
+
+    def update_positions(self):
+        with np.errstate(over='ignore'):
+            sigmoid = 1 / (1 + np.exp(-self.velocities))
+        draw = self.rng.random(self.velocities.shape, dtype=np.float32)
+        self.binary_table = np.packbits(draw < sigmoid, axis=1)
+
+    def update_personal_and_global_best(self):
+        fitness_current = self.evaluate(self.unpack(self.binary_table))
+
+        improved = fitness_current < self.personal_best_fitness
+        self.personal_best_positions[improved] = self.binary_table[improved]
+        self.personal_best_fitness[improved] = fitness_current[improved]
+
+        best = int(np.argmin(fitness_current))
+        if fitness_current[best] < self.global_best_fitness:
+            self.global_best_fitness = fitness_current[best]
+            self.global_best_bits = self.binary_table[best].copy()
+
+    def diversity(self):
+        p = self.unpack(self.binary_table).mean(axis=0)
+        return float(np.mean(4 * p * (1 - p))) if p.size else 0.0
+
+
+def _run_starts(keys):
+    """Start offsets of the runs of equal values in a sorted key array."""
+    if not len(keys):
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def _run_sums(values, starts):
+    """Per-row sums of each run of columns beginning at `starts`."""
+    if not len(starts):
+        return np.zeros((len(values), 0), dtype=np.int32)
+    return np.add.reduceat(values, starts, axis=1, dtype=np.int32)
+
+
+def make_pso(compact=False, islands=None, migration_interval=10,
+             course_names=None, student_names=None, **params):
+    """
+    BinaryPSO for params, CompactBinaryPSO when compact is set, or an
+    IslandPSO of `islands` BinaryPSO swarms when more than one island is
+    asked for. The display names carried along with form params are ignored.
+    """
+    if islands is not None and islands > 1:
+        if compact:
+            raise ValueError("Island mode runs dense swarms and cannot be combined with compact mode")
+        return IslandPSO(islands, migration_interval, **params)
+    return (CompactBinaryPSO if compact else BinaryPSO)(**params)
+
+
+# Shared stop decision: index into this tuple, written by island 0
+_ISLAND_STOPS = (None, 'target', 'patience', 'time', 'diversity', 'callback')
+
+
+def _island_stop(limits, control, best, stale, started):
+    """
+    Stop reason for the whole archipelago, from every island's published
+    fitness and diversity; mirrors BinaryPSO._stop_reason.
+    """
+    if control['cancel'][0]:
+        return 'callback'
+    if limits['target_fitness'] is not None and best <= limits['target_fitness']:
+        return 'target'
+    if limits['patience'] is not None and stale >= limits['patience']:
+        return 'patience'
+    if limits['time_budget'] is not None and time.perf_counter() - started >= limits['time_budget']:
+        return 'time'
+    if limits['min_diversity'] is not None and control['diversity'].mean() < limits['min_diversity']:
+        return 'diversity'
+    return None
+
+
+def _island_control(buf, num_islands):
+    """Views over the shared control block that precedes the position slots."""
+    k = num_islands
+    block = np.ndarray((3 * k + 3,), dtype=np.float64, buffer=buf)
+    return {
+        'fitness': block[:k],
+        'diversity': block[k:2 * k],
+        'progress': block[2 * k:3 * k],     # iterations each island has finished
+        'stop': block[3 * k:3 * k + 1],
+        'cancel': block[3 * k + 1:3 * k + 2],
+        'best': block[3 * k + 2:],          # best fitness at the last migration
+    }
+
+
+def _island_main(island, num_islands, pso_kwargs, seed, migration_interval,
+                 shm_name, shape, barrier, results):
+    """One island: a BinaryPSO swarm that swaps its best with its ring neighbour."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        control = _island_control(shm.buf, num_islands)
+        fitness = control['fitness']
+        offset = (3 * num_islands + 3) * 8
+        slots = np.ndarray((num_islands,) + shape, dtype=np.int8, buffer=shm.buf, offset=offset)
+        # The swarm itself never stops on its own: the islands must keep
+        # meeting at the barrier, so stopping is decided for all of them at
+        # migrations (see _island_stop)
+        limits = dict(target_fitness=0, patience=None, time_budget=None, min_diversity=None)
+        limits.update((name, pso_kwargs[name]) for name in list(limits) if name in pso_kwargs)
+        pso = BinaryPSO(**dict(pso_kwargs, target_fitness=None, patience=None,
+                               time_budget=None, min_diversity=None), seed=seed)
+        started = time.perf_counter()
+        best, stale = float('inf'), 0
+
+        def migrate(iteration, best_fitness):
+            nonlocal best, stale
+            control['progress'][island] = iteration
+            if iteration % migration_interval or iteration == pso.max_iterations:
+                return False
+            # Publish, wait for everyone, then take the migrant from island - 1
+            slots[island] = pso.global_best_position
+            fitness[island] = pso.global_best_fitness
+            control['diversity'][island] = pso.diversity()
+            barrier.wait()
+            source = (island - 1) % num_islands
+            migrant_fitness = fitness[source]
+            worst = int(np.argmax(pso.personal_best_fitness))
+            if migrant_fitness < pso.personal_best_fitness[worst]:
+                migrant = slots[source].astype(pso.binary_table.dtype)
+                pso.binary_table[worst] = migrant
+                pso.personal_best_positions[worst] = migrant
+                pso.personal_best_fitness[worst] = migrant_fitness
+                if migrant_fitness < pso.global_best_fitness:
+                    pso.global_best_position = migrant.copy()
+                    pso.global_best_fitness = migrant_fitness
+            overall = float(fitness.min())
+            if overall < best:
+                best, stale = overall, 0
+            else:
+                stale += migration_interval
+            if island == 0:
+                control['best'][0] = overall
+                reason = _island_stop(limits, control, best, stale, started)
+                control['stop'][0] = _ISLAND_STOPS.index(reason)
+            barrier.wait()  # nobody republishes before every island has read
+            return bool(control['stop'][0])
+
+        best_position, best_fitness, history = pso.run(callback=migrate)
+        slots[island] = best_position
+        fitness[island] = best_fitness
+        results.put((island, history.tolist()))
+    finally:
+        shm.close()
+
+
+class IslandPSO:
+    """
+    Island-model BinaryPSO: `num_islands` independent swarms, each in its own
+    process with a seed spawned from `seed`, that every `migration_interval`
+    iterations pass their global best to the next island in a ring through
+    shared memory. Migration is synchronous, so seeded runs are reproducible.
+
+    The stopping criteria of BinaryPSO apply to the archipelago as a whole
+    and are checked at migrations, so a run stops on a multiple of
+    `migration_interval` iterations (or at max_iterations). Patience counts
+    iterations since the best fitness across islands last improved.
+    """
+
+    def __init__(self, num_islands, migration_interval=10, seed=None, **pso_kwargs):
+        """
+        :num_islands: number of sub-swarms (and processes)
+        :migration_interval: iterations between migrations
+        :seed: master seed; island i uses SeedSequence(seed).spawn(num_islands)[i]
+        :pso_kwargs: BinaryPSO constructor arguments (without seed)
+        """
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.seed = seed
+        self.pso_kwargs = pso_kwargs
+        self.island_stats = []
+        self.history = np.empty(0)
+        self.stop_reason = None
+
+    def run(self, callback=None):
+        """
+        Run every island to the end, like BinaryPSO.run.
+
+        :callback: optional callable(iteration, best_fitness), polled while
+                   the islands run with the iterations every island has
+                   finished and the best fitness at the last migration;
+                   returning True stops them at the next migration
+        Returns (best_position, best_fitness, history) across islands, where
+        history[i] is the best fitness of any island after iteration i + 1,
+        and fills `island_stats` with one dict per island: final fitness and
+        its per-iteration best-fitness history.
+        """
+        k = self.num_islands
+        shape = (self.pso_kwargs['num_students'], self.pso_kwargs['num_courses'])
+        seeds = np.random.SeedSequence(self.seed).spawn(k)
+        context = multiprocessing.get_context('spawn')
+        offset = (3 * k + 3) * 8
+        shm = shared_memory.SharedMemory(create=True, size=offset + k * shape[0] * shape[1])
+        try:
+            control = _island_control(shm.buf, k)
+            control['stop'][0] = control['cancel'][0] = 0
+            control['progress'][:] = 0
+            control['best'][0] = float('inf')
+            barrier = context.Barrier(k)
+            results = context.Queue()
+            procs = [
+                context.Process(target=_island_main,
+                                args=(i, k, self.pso_kwargs, seeds[i], self.migration_interval,
+                                      shm.name, shape, barrier, results))
+                for i in range(k)
+            ]
+            for proc in procs:
+                proc.start()
+
+            histories = {}
+            while len(histories) < k:
+                try:
+                    island, history = results.get(timeout=0.2 if callback else 1)
+                    histories[island] = history
+                except queue.Empty:
+                    if any(p.exitcode not in (None, 0) for p in procs):
+                        barrier.abort()
+                        for p in procs:
+                            p.terminate()
+                        raise RuntimeError("A PSO island process failed")
+                if callback is not None and not control['cancel'][0]:
+                    if callback(int(control['progress'].min()), float(control['best'][0])):
+                        control['cancel'][0] = 1
+            for proc in procs:
+                proc.join()
+
+            fitness = control['fitness'].copy()
+            stop = int(control['stop'][0])
+            del control
+            slots = np.ndarray((k,) + shape, dtype=np.int8, buffer=shm.buf, offset=offset)
+            best = int(np.argmin(fitness))
+            best_position = slots[best].astype(np.int64)
+            del slots
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self.island_stats = [
+            {'island': i, 'best_fitness': float(fitness[i]), 'history': histories[i]}
+            for i in range(k)
+        ]
+        self.history = np.min([histories[i] for i in range(k)], axis=0)
+        self.stop_reason = _ISLAND_STOPS[stop] or 'max_iterations'
+        return best_position, float(fitness[best]), self.history
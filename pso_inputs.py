@@ -0,0 +1,128 @@
+import csv
+import io
+
+from catalog import normalize
+from timeslots import format_slot
+
+# Long-format preference table: one row per (student, wanted course)
+PREFERENCE_COLUMNS = ('student', 'course')
+
+
+def iter_preference_rows(stream, filename=''):
+    """
+    Stream (student, course) pairs from an uploaded CSV or Parquet file
+    without reading it into memory. `course` is a section id or a course
+    name. Parquet is picked by the .parquet/.pq extension and needs pyarrow.
+    """
+    if filename.lower().endswith(('.parquet', '.pq')):
+        return _iter_parquet(stream)
+    return _iter_csv(stream)
+
+
+def _iter_csv(stream):
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(stream)
+    header = [h.strip().lower() for h in next(reader, [])]
+    try:
+        student_col, course_col = (header.index(c) for c in PREFERENCE_COLUMNS)
+    except ValueError:
+        raise ValueError(f"Preference file needs columns {', '.join(PREFERENCE_COLUMNS)}; got {header}")
+    for line, row in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        try:
+            yield row[student_col].strip(), row[course_col].strip()
+        except IndexError:
+            raise ValueError(f"Preference file line {line}: expected {len(header)} columns")
+
+
+def _iter_parquet(stream, batch_size=65536):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading Parquet preference files needs pyarrow installed") from None
+    parquet = pq.ParquetFile(stream)
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=list(PREFERENCE_COLUMNS)):
+        students = batch.column(0).to_pylist()
+        courses = batch.column(1).to_pylist()
+        for student, course in zip(students, courses):
+            yield str(student).strip(), str(course).strip()
+
+
+class PSOInputBuilder:
+    """
+    Compile catalog sections and a student preference table into the
+    arrays BinaryPSO takes.
+
+    Each section id (of `program`, or of the whole catalog) is one PSO
+    course: its label is the course name, its times are the section's
+    meeting rows (rebuilt from the catalog's minute columns) and its cap
+    is the catalog capacity. A preference naming a course rather than a
+    section id means every section of that course.
+    """
+
+    def __init__(self, catalog, program=None):
+        if program is not None and program not in catalog.by_program:
+            raise ValueError(f"Unknown program: {program!r}")
+        rows = catalog.by_program[program] if program is not None else catalog.courses
+        table = catalog.table
+
+        self.section_ids = list(dict.fromkeys(c.id for c in rows))
+        self.position = {cid: i for i, cid in enumerate(self.section_ids)}
+        self.course_labels = [catalog.id_constraints[cid]['course_name'] for cid in self.section_ids]
+        self.course_caps = [catalog.id_capacity[cid] for cid in self.section_ids]
+
+        times = [[] for _ in self.section_ids]
+        for course in rows:
+            row = course._row
+            if table.day_index[row] >= 0:
+                times[self.position[course.id]].append(
+                    format_slot(int(table.day_index[row]), int(table.start[row]), int(table.end[row])))
+        self.course_times = [list(dict.fromkeys(slots)) for slots in times]
+
+        self.name_positions = {}
+        for i, name in enumerate(self.course_labels):
+            self.name_positions.setdefault(normalize(name).lower(), []).append(i)
+
+        self.student_ids = []
+        self.unknown_courses = set()
+
+    def positions_of(self, course):
+        """PSO course positions a preference entry refers to ([] if unknown)."""
+        if course in self.position:
+            return [self.position[course]]
+        return self.name_positions.get(normalize(course).lower(), [])
+
+    def read_preferences(self, rows):
+        """
+        Consume (student, course) pairs; returns student_preferences, one
+        list of positions per student in first-seen order (`student_ids`).
+        Unknown courses are skipped and collected in `unknown_courses`.
+        """
+        student_index = {}
+        preferences = []
+        for student, course in rows:
+            i = student_index.get(student)
+            if i is None:
+                i = student_index[student] = len(preferences)
+                preferences.append({})
+            positions = self.positions_of(course)
+            if not positions:
+                self.unknown_courses.add(course)
+            for pos in positions:
+                preferences[i][pos] = None
+        self.student_ids = list(student_index)
+        return [list(prefs) for prefs in preferences]
+
+    def build(self, rows):
+        """BinaryPSO problem arguments for the preference pairs in rows."""
+        student_preferences = self.read_preferences(rows)
+        return dict(
+            num_students=len(student_preferences),
+            num_courses=len(self.section_ids),
+            student_preferences=student_preferences,
+            course_times=self.course_times,
+            course_labels=self.course_labels,
+            course_caps=self.course_caps,
+        )
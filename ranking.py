@@ -0,0 +1,231 @@
+import heapq
+
+from timeslots import MINUTES_PER_DAY, parse_clock, parse_slot
+
+
+class ScheduleObjective:
+    """
+    Soft preferences over complete schedules, as a cost to minimize.
+
+    Every term has a non-negative weight (0 switches it off):
+      • days:       number of distinct campus days
+      • gap hours:  idle time between consecutive classes on the same day
+      • instructor: sections not taught by one of `preferred_instructors`
+      • early/late: meetings starting before `earliest` or ending after `latest`
+    """
+
+    def __init__(self, days_weight=1.0, gap_weight=1.0, instructor_weight=1.0,
+                 edge_weight=1.0, preferred_instructors=(), earliest='09:00', latest='17:00'):
+        self.days_weight = days_weight
+        self.gap_weight = gap_weight
+        self.instructor_weight = instructor_weight if preferred_instructors else 0
+        self.edge_weight = edge_weight
+        self.preferred_instructors = {name.strip().lower() for name in preferred_instructors}
+        self.earliest = parse_clock(earliest)
+        self.latest = parse_clock(latest)
+
+    def compile(self, index, cid_constraints, courses=()):
+        """Per-section terms over the ConflictIndex positions; see SectionCosts."""
+        return SectionCosts(self, index, cid_constraints, courses)
+
+
+class SectionCosts:
+    """
+    An objective compiled against one catalog. Each section position gets
+    its meetings, a day bitmask, an instructor penalty and an early/late
+    count. The class also provides the exact cost of a schedule and an
+    admissible lower bound for a partial one.
+    """
+
+    def __init__(self, objective, index, cid_constraints, courses=()):
+        self.objective = objective
+        self.index = index
+        instructors = {}
+        for course in courses:
+            instructors.setdefault(course.id, set()).add(course.instructor.strip().lower())
+
+        self.meetings = []      # position -> [(day, start, end)] in minutes of the day
+        self.day_mask = []      # position -> bitmask of campus days
+        self.penalty = []       # position -> 1 if no preferred instructor teaches it
+        self.edges = []         # position -> meetings outside [earliest, latest]
+        for cid in index.ids:
+            meetings = []
+            for slot in cid_constraints[cid]['constraints']:
+                try:
+                    lo, hi = parse_slot(slot)
+                except ValueError:
+                    continue    # unscheduled (e.g. 'TBA'), as in IntervalModel
+                day = lo // MINUTES_PER_DAY
+                meetings.append((day, lo - day * MINUTES_PER_DAY, hi - day * MINUTES_PER_DAY))
+            self.meetings.append(meetings)
+            mask = 0
+            for day, _, _ in meetings:
+                mask |= 1 << day
+            self.day_mask.append(mask)
+            preferred = instructors.get(cid, set()) & objective.preferred_instructors
+            self.penalty.append(0 if preferred else 1)
+            self.edges.append(sum(1 for _, start, end in meetings
+                                  if start < objective.earliest or end > objective.latest))
+
+    def _day_spans(self, positions):
+        """day -> (first start, last end, busy minutes) over the given sections."""
+        spans = {}
+        for pos in positions:
+            for day, start, end in self.meetings[pos]:
+                lo, hi, busy = spans.get(day, (start, end, 0))
+                spans[day] = (min(lo, start), max(hi, end), busy + end - start)
+        return spans
+
+    def cost(self, positions):
+        """Exact cost of a complete schedule, given its section positions."""
+        obj = self.objective
+        days = 0
+        for pos in positions:
+            days |= self.day_mask[pos]
+        total = obj.days_weight * bin(days).count("1")
+        if obj.gap_weight:
+            gaps = sum(hi - lo - busy for lo, hi, busy in self._day_spans(positions).values())
+            total += obj.gap_weight * gaps / 60
+        if obj.instructor_weight:
+            total += obj.instructor_weight * sum(self.penalty[pos] for pos in positions)
+        if obj.edge_weight:
+            total += obj.edge_weight * sum(self.edges[pos] for pos in positions)
+        return total
+
+    def bound(self, positions, domains):
+        """
+        Lower bound on the cost of any completion of a partial schedule.
+
+        :positions: section positions assigned so far
+        :domains: live bitsets of the unassigned variables
+
+        Each unassigned course adds at least its cheapest section's
+        instructor and early/late terms. It adds at least as many new days
+        as its cheapest section needs, so the largest such count is a bound.
+        Gaps can only shrink by what the remaining sections could fill
+        inside today's spans.
+        """
+        obj = self.objective
+        candidates = [self._positions(bits) for bits in domains]
+
+        used = 0
+        for pos in positions:
+            used |= self.day_mask[pos]
+        new_days = max((min(bin(self.day_mask[p] & ~used).count("1") for p in cands)
+                        for cands in candidates), default=0)
+        total = obj.days_weight * (bin(used).count("1") + new_days)
+
+        if obj.gap_weight:
+            spans = self._day_spans(positions)
+            gaps = sum(hi - lo - busy for lo, hi, busy in spans.values())
+            fill = 0
+            for cands in candidates:
+                best = 0
+                for p in cands:
+                    covered = 0
+                    for day, start, end in self.meetings[p]:
+                        if day in spans:
+                            lo, hi, _ = spans[day]
+                            covered += max(0, min(end, hi) - max(start, lo))
+                    best = max(best, covered)
+                fill += best
+            total += obj.gap_weight * max(0, gaps - fill) / 60
+
+        if obj.instructor_weight:
+            total += obj.instructor_weight * (
+                sum(self.penalty[pos] for pos in positions) +
+                sum(min(self.penalty[p] for p in cands) for cands in candidates))
+        if obj.edge_weight:
+            total += obj.edge_weight * (
+                sum(self.edges[pos] for pos in positions) +
+                sum(min(self.edges[p] for p in cands) for cands in candidates))
+        return total
+
+    @staticmethod
+    def _positions(bits):
+        out = []
+        while bits:
+            low = bits & -bits
+            out.append(low.bit_length() - 1)
+            bits ^= low
+        return out
+
+
+class RankedSearch:
+    """
+    Best-first branch-and-bound over a ScheduleSearch.
+
+    Open nodes sit in a priority queue keyed by their lower bound; a complete
+    schedule's key is its exact cost and it wins ties, so schedules come off
+    the queue cheapest first and can be streamed as they are found. Once k
+    complete schedules are known, any node whose bound is not below the k-th
+    cheapest of them is dropped. Nodes store only their path; a node's
+    search state is rebuilt by replaying the path with push().
+    """
+
+    def __init__(self, search, costs):
+        self.search = search
+        self.costs = costs
+        self.position = search.index.position
+
+    def _assigned_positions(self):
+        return [self.position[cid] for cid in self.search.assignment.values()]
+
+    def _key(self):
+        """(exact cost, 0) for a complete schedule, (lower bound, 1) for a partial one."""
+        search = self.search
+        positions = self._assigned_positions()
+        unassigned = search.unassigned()
+        if not unassigned:
+            return self.costs.cost(positions), 0
+        return self.costs.bound(positions, [search.domains[var] for var in unassigned]), 1
+
+    def best(self, k):
+        """Yield up to k (cost, solution) pairs, cheapest first."""
+        search = self.search
+        tracer = search.tracer
+        if k <= 0:
+            return
+        seq = 0
+        bound, partial = self._key()
+        queue = [(bound, partial, seq, ())]
+        incumbents = []     # max-heap (negated) of the k cheapest complete costs seen
+        emitted = 0
+
+        while queue and emitted < k:
+            bound, partial, _, path = heapq.heappop(queue)
+            if partial and len(incumbents) == k and bound >= -incumbents[0]:
+                # queued before the k-th best improved; it cannot make the cut
+                tracer.count("bound_pruned")
+                continue
+
+            for var, val in path:
+                search.push(var, val)
+            try:
+                if not partial:
+                    emitted += 1
+                    tracer.count("solutions")
+                    yield bound, {var: search.assignment[var] for var in search.vars}
+                    continue
+
+                tracer.count("nodes")
+                var = search.select_var()
+                for val in search.candidates(var):
+                    if search.push(var, val):
+                        key, child_partial = self._key()
+                        if len(incumbents) == k and key >= -incumbents[0]:
+                            tracer.count("bound_pruned")
+                        else:
+                            if not child_partial:
+                                if len(incumbents) == k:
+                                    heapq.heapreplace(incumbents, -key)
+                                else:
+                                    heapq.heappush(incumbents, -key)
+                            seq += 1
+                            heapq.heappush(queue, (key, child_partial, seq, path + ((var, val),)))
+                    else:
+                        tracer.count("dead_ends")
+                    search.pop()
+            finally:
+                for _ in path:
+                    search.pop()
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+def canonical_key(catalog_version, program, picks, no_class):
+    """
+    Stable hash of a solve's inputs. The same picks and no-class slots give
+    the same key regardless of order or duplicates.
+    """
+    payload = json.dumps([
+        list(catalog_version or ()),
+        program,
+        sorted(set(picks)),
+        sorted({tuple(nc) for nc in no_class}),
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultStore:
+    """
+    In-process key/value store for solver results, kept out of the cookie session.
+
+    Entries expire `ttl` seconds after they were last written and the store
+    evicts least-recently-used entries once more than `max_entries` are held
+    or their declared sizes add up to more than `max_bytes`.  Values are kept
+    as-is, so callers should store compact encodings (e.g. index arrays).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600, max_entries=4096):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes, expires_at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_key():
+        return uuid.uuid4().hex
+
+    def put(self, key, value, nbytes=0):
+        """Store value under key, replacing any previous entry."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, nbytes, time.monotonic() + self.ttl)
+            self.nbytes += nbytes
+            self._evict()
+        return key
+
+    def setdefault(self, key, value, nbytes=0):
+        """
+        The live value under key, or store value there and return it. The
+        check and the insert happen under one lock, so concurrent callers
+        all get the same object.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            self._entries[key] = (value, nbytes, time.monotonic() + self.ttl)
+            self.nbytes += nbytes
+            self._evict()
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def discard(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self.nbytes -= nbytes
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (_, _, expires) in self._entries.items() if expires < now]:
+            self._drop(key)
+        while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
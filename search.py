@@ -0,0 +1,329 @@
+from tracing import ARC
+
+# Nodes between two calls of a search's `stop` callable
+STOP_CHECK_NODES = 256
+
+
+class ScheduleSearch:
+    """
+    Backtracking search over AC-3 domains with incremental state.
+
+    Live domains are bitsets over the ConflictIndex's section positions.
+    `push(var, val)` assigns a section and forward-checks every unassigned
+    variable with one `&` against the value's compatibility bitset
+    (optionally followed by full arc consistency, MAC); every domain it
+    narrows is recorded on a trail so `pop()` restores the previous state
+    exactly.  Variables are picked by MRV (smallest live domain, ties broken
+    by the original variable order).
+    """
+
+    def __init__(self, index, domains, tracer, propagation='fc', stop=None):
+        """
+        :index: ConflictIndex the section ids belong to
+        :domains: dict course_name -> list of course ids (after AC-3)
+        :tracer: Tracer for node / pruning counters
+        :propagation: 'fc' (forward checking) or 'mac' (maintain arc consistency)
+        :stop: optional callable, polled every STOP_CHECK_NODES nodes; once it
+               returns True the enumeration ends early and `stopped` is set
+        """
+        if propagation not in ('fc', 'mac'):
+            raise ValueError(f"Unknown propagation mode: {propagation!r}")
+        self.index = index
+        self.tracer = tracer
+        self.mac = propagation == 'mac'
+        self.vars = list(domains)
+        self.order = {var: i for i, var in enumerate(self.vars)}
+        self.domains = {var: index.bits_of(ids) for var, ids in domains.items()}
+        self.compatible_at = [index.compatible[cid] for cid in index.ids]
+
+        self.assignment = {}
+        self.cursor = None
+        self.stop = stop
+        self.stopped = False
+        self._until_check = STOP_CHECK_NODES
+        self._trail = []        # (var, previous bitset)
+        self._frames = []       # (var, trail length)
+
+    # ——— state ———
+
+    def unassigned(self):
+        return [var for var in self.vars if var not in self.assignment]
+
+    def push(self, var, val):
+        """
+        Assign val to var and propagate. Returns False on a domain wipe-out;
+        the assignment stays pushed either way, so always pair with pop().
+        """
+        self._frames.append((var, len(self._trail)))
+        self.assignment[var] = val
+
+        compat = self.index.compatible[val]
+        changed = []
+        for other in self.vars:
+            if other in self.assignment:
+                continue
+            dom = self.domains[other]
+            new = dom & compat
+            if new != dom:
+                self._trail.append((other, dom))
+                self.domains[other] = new
+                self.tracer.count("fc_pruned", bin(dom ^ new).count("1"))
+                if not new:
+                    return False
+                changed.append(other)
+
+        if self.mac and changed:
+            return self._propagate(changed)
+        return True
+
+    def pop(self):
+        var, mark = self._frames.pop()
+        trail = self._trail
+        while len(trail) > mark:
+            other, dom = trail.pop()
+            self.domains[other] = dom
+        del self.assignment[var]
+
+    def _propagate(self, changed):
+        """AC-3 over the unassigned variables, starting from arcs into `changed`."""
+        future = self.unassigned()
+        queue = [(xi, xj) for xj in changed for xi in future if xi != xj]
+        queued = set(queue)
+        while queue:
+            xi, xj = queue.pop()
+            queued.discard((xi, xj))
+            dom = self.domains[xi]
+            support = self.domains[xj]
+            keep = dom
+            bits = dom
+            while bits:
+                low = bits & -bits
+                if not self.compatible_at[low.bit_length() - 1] & support:
+                    keep ^= low
+                bits ^= low
+            if keep != dom:
+                self._trail.append((xi, dom))
+                self.domains[xi] = keep
+                self.tracer.count("mac_pruned", bin(dom ^ keep).count("1"))
+                if not keep:
+                    return False
+                for xk in future:
+                    if xk != xi and xk != xj and (xk, xi) not in queued:
+                        queue.append((xk, xi))
+                        queued.add((xk, xi))
+        return True
+
+    def select_var(self):
+        """MRV: the unassigned variable with the fewest live values."""
+        return min(self.unassigned(),
+                   key=lambda var: (bin(self.domains[var]).count("1"), self.order[var]))
+
+    def candidates(self, var):
+        return self.index.ids_of(self.domains[var])
+
+    # ——— enumeration ———
+
+    def solutions(self, cursor=None):
+        """
+        Yield every full assignment, as dict course_name -> course_id in the
+        original variable order. After each yield `self.cursor` is the list
+        of candidate positions chosen at each depth; passing it back resumes
+        right after that solution.
+        """
+        if cursor is not None:
+            resume = list(cursor)
+            resume[-1] += 1
+        else:
+            resume = None
+        path = []
+        yield from self._backtrack(0, resume, path)
+
+    def frontier(self, depth):
+        """
+        Candidate-position prefixes of every live node `depth` levels below
+        the root, in search order. The subtrees under them partition the
+        solutions, and enumerating them in this order gives the same order
+        as solutions().
+        """
+        prefixes = []
+        path = []
+
+        def walk(level):
+            if level == depth or len(self.assignment) == len(self.vars):
+                prefixes.append(tuple(path))
+                return
+            var = self.select_var()
+            for i, val in enumerate(self.candidates(var)):
+                path.append(i)
+                if self.push(var, val):
+                    walk(level + 1)
+                self.pop()
+                path.pop()
+
+        walk(0)
+        return prefixes
+
+    def subtree(self, prefix, cursor=None):
+        """
+        Yield the solutions below a prefix returned by frontier(). With a
+        cursor taken from inside that subtree, resume right after it.
+        """
+        if cursor is not None:
+            if len(cursor) <= len(prefix):
+                # The prefix was already a full assignment, and it was the
+                # subtree's only solution
+                return
+            resume = list(cursor)
+            resume[-1] += 1
+        else:
+            resume = None
+        start = len(self._frames)
+        try:
+            for i in prefix:
+                var = self.select_var()
+                if not self.push(var, self.candidates(var)[i]):
+                    return
+            yield from self._backtrack(len(prefix), resume, list(prefix))
+        finally:
+            # Also unwinds the search when the caller stops early, so the
+            # same object can take the next subtree
+            while len(self._frames) > start:
+                self.pop()
+
+    def _should_stop(self):
+        if not self.stopped:
+            self._until_check -= 1
+            if not self._until_check:
+                self._until_check = STOP_CHECK_NODES
+                self.stopped = bool(self.stop())
+        return self.stopped
+
+    def _backtrack(self, depth, resume, path):
+        if self.stop is not None and self._should_stop():
+            return
+        tracer = self.tracer
+        tracer.count("nodes")
+        if len(self.assignment) == len(self.vars):
+            self.cursor = tuple(path)
+            yield {var: self.assignment[var] for var in self.vars}
+            return
+
+        var = self.select_var()
+        values = self.candidates(var)
+        first = resume[depth] if resume else 0
+        for i in range(first, len(values)):
+            path.append(i)
+            if self.push(var, values[i]):
+                yield from self._backtrack(depth + 1, resume if i == first else None, path)
+            else:
+                tracer.count("dead_ends")
+                if tracer.level >= ARC:
+                    tracer.emit(ARC, f"Dead end at {var}={values[i]}")
+            self.pop()
+            path.pop()
+
+
+class SolutionCounter:
+    """
+    Exact number of full assignments, without enumerating them.
+
+    Variables whose live domains cannot clash are independent, so the
+    count over them is the product of the counts of the connected
+    components of the constraint graph. The graph is split again after
+    every assignment, because assigning a value can disconnect what is
+    left. Component counts are memoized on the component's remaining
+    domains, since different branches often leave identical subproblems.
+    """
+
+    def __init__(self, index, domains, tracer):
+        """
+        :index: ConflictIndex the section ids belong to
+        :domains: dict course_name -> list of course ids (after AC-3)
+        :tracer: Tracer for node / memo counters
+        """
+        self.index = index
+        self.tracer = tracer
+        self.vars = list(domains)
+        self.domains = {var: index.bits_of(ids) for var, ids in domains.items()}
+        everything = (1 << len(index.ids)) - 1
+        self.compatible_at = [index.compatible[cid] for cid in index.ids]
+        self.clash_at = [everything & ~bits for bits in self.compatible_at]
+        self._memo = {}
+
+    def count(self):
+        if not self.vars:
+            return 0
+        total = 1
+        for component in self._components(self.vars, self.domains):
+            total *= self._count(component, self.domains)
+            if not total:
+                break
+        return total
+
+    def _clashes(self, bits):
+        """Every section that overlaps some value in bits."""
+        out = 0
+        clash_at = self.clash_at
+        while bits:
+            low = bits & -bits
+            out |= clash_at[low.bit_length() - 1]
+            bits ^= low
+        return out
+
+    def _components(self, vars_, domains):
+        """Split vars_ into groups with no possible clash between groups."""
+        clashes = {var: self._clashes(domains[var]) for var in vars_}
+        left = list(vars_)
+        components = []
+        while left:
+            stack = [left.pop(0)]
+            component = []
+            while stack:
+                var = stack.pop()
+                component.append(var)
+                reach = clashes[var]
+                linked = [other for other in left if reach & domains[other]]
+                for other in linked:
+                    left.remove(other)
+                stack.extend(linked)
+            # Fixed variable order inside a component keeps memo keys canonical
+            components.append(tuple(sorted(component, key=self.vars.index)))
+        self.tracer.count("components", len(components))
+        return components
+
+    def _count(self, component, domains):
+        key = (component, tuple(domains[var] for var in component))
+        cached = self._memo.get(key)
+        if cached is not None:
+            self.tracer.count("memo_hits")
+            return cached
+        self.tracer.count("count_nodes")
+
+        if len(component) == 1:
+            total = bin(domains[component[0]]).count("1")
+        else:
+            # Branch on the variable that clashes with the most others, so the
+            # rest falls apart sooner; fewest values breaks ties
+            clashes = {v: self._clashes(domains[v]) for v in component}
+            var = max(component, key=lambda v: (
+                sum(1 for other in component if other != v and clashes[v] & domains[other]),
+                -bin(domains[v]).count("1")))
+            rest = [v for v in component if v != var]
+            total = 0
+            bits = domains[var]
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                compat = self.compatible_at[low.bit_length() - 1]
+                narrowed = {v: domains[v] & compat for v in rest}
+                if not all(narrowed.values()):
+                    continue
+                product = 1
+                for sub in self._components(rest, narrowed):
+                    product *= self._count(sub, narrowed)
+                    if not product:
+                        break
+                total += product
+
+        self._memo[key] = total
+        return total
@@ -0,0 +1,60 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+from timeslots import parse_slot
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+TIMES = ['08:30-09:45', '10:00-11:15', '11:30-12:45', '13:00-14:15', '14:30-15:45', '16:00-17:15']
+
+
+def random_catalog(seed, courses=5, max_sections=4):
+    """cid_constraints for a small random catalog: each section meets on two days."""
+    rng = random.Random(seed)
+    catalog = {}
+    for ci in range(courses):
+        for _ in range(rng.randint(1, max_sections)):
+            day = rng.randrange(3)
+            slots = {f"{DAYS[day]} {rng.choice(TIMES)}", f"{DAYS[day + 2]} {rng.choice(TIMES)}"}
+            catalog[str(1000 + len(catalog))] = {'constraints': sorted(slots), 'course_name': f"C{ci}"}
+    return catalog
+
+
+def random_constraints(seed, catalog):
+    """Random picked sections (as objects with .id) and (day, time) no-class slots."""
+    rng = random.Random(seed)
+    picks = [SimpleNamespace(id=cid) for cid in rng.sample(sorted(catalog), rng.randint(0, 2))]
+    no_class = [(rng.choice(DAYS), rng.choice(TIMES)) for _ in range(rng.randint(0, 2))]
+    return picks, no_class
+
+
+def brute_force(cid_constraints, domains):
+    """Every clash-free choice of one section per course, by trying all combinations."""
+    meetings = {cid: [parse_slot(slot) for slot in info['constraints']]
+                for cid, info in cid_constraints.items()}
+
+    def clash(a, b):
+        return any(lo_a < hi_b and lo_b < hi_a
+                   for lo_a, hi_a in meetings[a] for lo_b, hi_b in meetings[b])
+
+    names = list(domains)
+    return [dict(zip(names, combo))
+            for combo in itertools.product(*(domains[name] for name in names))
+            if not any(clash(a, b) for a, b in itertools.combinations(combo, 2))]
+
+
+def as_set(solutions):
+    return {frozenset(solution.items()) for solution in solutions}
+
+
+def random_pso_problem(seed, students=6, courses=5, labels=3):
+    """BinaryPSO problem arguments (no swarm settings) for a small random cohort."""
+    rng = random.Random(seed)
+    return dict(
+        num_students=students, num_courses=courses,
+        student_preferences=[rng.sample(range(courses), rng.randint(0, courses)) for _ in range(students)],
+        course_times=[[(rng.choice(['Mon', 'Tue', 'Wed']), h, h + rng.randint(1, 2))
+                       for h in rng.sample(range(8, 16), rng.randint(1, 2))] for _ in range(courses)],
+        course_labels=[f"L{rng.randrange(labels)}" for _ in range(courses)],
+        course_caps=[rng.randint(1, students) for _ in range(courses)],
+    )
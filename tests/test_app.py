@@ -0,0 +1,25 @@
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.chdir(app_module.app.root_path)
+    return app_module.app.test_client()
+
+
+def test_ac3_stats_count_reused_runs(client):
+    program = app_module.CourseDataLoader('courses.json').get_available_programs()[0]
+    before = client.get('/ac3_stats').get_json()['runs']
+
+    first, second = app_module.app.test_client(), app_module.app.test_client()
+    for session_client in (first, second):
+        session_client.post('/', data={'program': program})
+        session_client.post('/ac3_schedule')
+
+    stats = client.get('/ac3_stats').get_json()
+    assert stats['runs']['created'] + stats['runs']['reused'] == before['created'] + before['reused'] + 2
+    # The second session asked for the same inputs as the first
+    assert stats['runs']['reused'] >= before['reused'] + 1
+    assert stats['store']['entries'] >= 1 and stats['store']['bytes'] > 0
@@ -0,0 +1,64 @@
+import csv
+import json
+import shutil
+
+import pytest
+
+import catalog_store
+from catalog import CATALOG_SUFFIX, CourseDataLoader, CourseTable
+from ingest_catalog import compile_catalog
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    """courses.json written out as a CSV and compiled, in its own directory."""
+    with open('courses.json', encoding='utf-8') as f:
+        records = json.load(f)
+    csv_path = tmp_path / 'schedule.csv'
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(CourseDataLoader.REQUIRED_FIELDS))
+        writer.writeheader()
+        writer.writerows(records)
+    (tmp_path / 'compiled').mkdir()
+    path = tmp_path / 'compiled' / ('courses' + CATALOG_SUFFIX)
+    rows, _ = compile_catalog(str(csv_path), str(path))
+    assert rows == len(records)
+    return path
+
+
+def test_compiled_catalog_matches_json(tmp_path, compiled):
+    (tmp_path / 'json').mkdir()
+    shutil.copy('courses.json', tmp_path / 'json' / 'courses.json')
+    from_json = CourseDataLoader(str(tmp_path / 'json' / 'courses.json')).catalog
+    # No JSON next to it, so the loader takes the compiled file
+    from_catalog = CourseDataLoader(str(compiled.with_suffix('.json'))).catalog
+    assert from_catalog.version[0] == str(compiled)
+
+    assert [c.to_dict() for c in from_catalog.courses] == [c.to_dict() for c in from_json.courses]
+    assert from_catalog.id_constraints == from_json.id_constraints
+    assert from_catalog.id_capacity == from_json.id_capacity
+
+
+def test_flipped_byte_fails_the_hash(compiled):
+    _, header = catalog_store.read(str(compiled))
+    data = bytearray(compiled.read_bytes())
+    _, _, header_len = catalog_store._PREFIX.unpack_from(data)
+    data_start = catalog_store._aligned(catalog_store._PREFIX.size + header_len)
+    data[data_start + header['arrays']['string_blob']['offset']] ^= 0x01
+    compiled.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="hash mismatch"):
+        CourseTable.load(str(compiled))
+
+
+def test_truncated_or_garbled_header_is_a_value_error(compiled):
+    data = compiled.read_bytes()
+    compiled.write_bytes(data[:catalog_store._PREFIX.size + 10])
+    with pytest.raises(ValueError, match="truncated catalog header"):
+        catalog_store.read(str(compiled))
+
+    garbled = bytearray(data)
+    garbled[catalog_store._PREFIX.size] = ord('x')
+    compiled.write_bytes(bytes(garbled))
+    with pytest.raises(ValueError, match="corrupt catalog header"):
+        catalog_store.read(str(compiled))
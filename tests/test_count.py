@@ -0,0 +1,23 @@
+import pytest
+
+from ac3 import AC3
+from helpers import brute_force, random_catalog, random_constraints
+from tracing import Tracer, OFF
+
+
+@pytest.mark.parametrize('courses, max_sections', [(5, 4), (5, 8), (8, 8)])
+@pytest.mark.parametrize('seed', range(30))
+def test_count_matches_solve(seed, courses, max_sections):
+    catalog = random_catalog(seed, courses=courses, max_sections=max_sections)
+    picks, no_class = random_constraints(seed, catalog)
+
+    count = AC3([], catalog, picks, no_class, tracer=Tracer(OFF)).count_solutions()
+    assert count == len(AC3([], catalog, picks, no_class, tracer=Tracer(OFF)).solve())
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_count_matches_brute_force(seed):
+    catalog = random_catalog(seed, courses=5, max_sections=8)
+    algo = AC3([], catalog, tracer=Tracer(OFF))
+    expected = len(brute_force(catalog, algo.domains))
+    assert algo.count_solutions() == expected
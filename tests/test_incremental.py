@@ -0,0 +1,59 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from ac3 import AC3
+from helpers import DAYS, TIMES, random_catalog
+from incremental import IncrementalAC3
+from tracing import Tracer, OFF
+
+
+def edit_sequence(seed, catalog, steps=12):
+    """Random (picked section ids, no-class slots) states, each one edit from the last."""
+    rng = random.Random(seed)
+    picks, no_class = [], []
+    for _ in range(steps):
+        edit = rng.choice(['pick', 'pick', 'unpick', 'no_class', 'no_class', 'allow'])
+        if edit == 'pick':
+            cid = rng.choice(sorted(catalog))
+            if cid not in picks:
+                picks.append(cid)
+        elif edit == 'unpick' and picks:
+            picks.remove(rng.choice(picks))
+        elif edit == 'no_class':
+            slot = (rng.choice(DAYS), rng.choice(TIMES))
+            if slot not in no_class:
+                no_class.append(slot)
+        elif edit == 'allow' and no_class:
+            no_class.remove(rng.choice(no_class))
+        yield list(picks), list(no_class)
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_incremental_matches_cold_solve(seed):
+    catalog = random_catalog(seed, courses=5, max_sections=8)
+    state = IncrementalAC3(AC3([], catalog, tracer=Tracer(OFF)))
+
+    for picks, no_class in edit_sequence(seed, catalog):
+        cold = AC3([], catalog, [SimpleNamespace(id=cid) for cid in picks], no_class,
+                   tracer=Tracer(OFF))
+        expected = cold.solve()
+
+        warm = state.solver(picks, no_class, tracer=Tracer(OFF))
+        # Same solutions in the same order, so pages and cursors line up
+        assert warm.solve() == expected
+        assert state.solver(picks, no_class, tracer=Tracer(OFF)).count_solutions() == len(expected)
+
+
+def test_nbytes_follows_the_trail():
+    catalog = random_catalog(3, courses=5, max_sections=8)
+    state = IncrementalAC3(AC3([], catalog, tracer=Tracer(OFF)))
+    base = state.nbytes
+    assert base > 0
+
+    slots = [(day, time) for day in DAYS for time in TIMES]
+    state.sync([], slots[:4])
+    assert state.nbytes > base
+    state.sync([], [])
+    assert state.nbytes == base
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import app as app_module
+from jobs import JobManager, JobQueueFull, run_ac3_job
+
+PSO_FORM = dict(
+    num_students='8', num_courses='4', num_particles='6', max_iterations='30',
+    inertia_weight='0.7', cognitive_coefficient='1.5', social_coefficient='1.5',
+    preference_weight='1', time_weight='3', label_weight='4', capacity_weight='2',
+    course_load_weight='5', seed='1', target_fitness='-1',
+    student_preferences='[[0, 1], [1, 2], [0], [2], [0, 1, 2], [0, 1, 3], [3], [2, 3]]',
+    course_times="[[['Mon', 9, 10], ['Wed', 11, 12]], [['Tue', 10, 11]], [['Fri', 14, 15]], [['Mon', 9, 10]]]",
+    course_labels='A,A,B,B', course_caps='[2, 2, 2, 2]',
+)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """A small JobManager standing in for the app's."""
+    managers = []
+
+    def make(**kwargs):
+        manager = JobManager(**kwargs)
+        managers.append(manager)
+        monkeypatch.setattr(app_module, 'job_manager', manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.shutdown()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.chdir(app_module.app.root_path)
+    return app_module.app.test_client()
+
+
+def wait_for(client, job_id, states, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = client.get(f'/jobs/{job_id}').get_json()
+        if info['state'] in states:
+            return info
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} still {info['state']}")
+
+
+def test_pso_form_runs_as_a_job(manager, client):
+    manager(max_workers=1)
+    response = client.post('/pso_schedule', data=PSO_FORM)
+    assert response.status_code == 302
+    job_id = response.headers['Location'].rstrip('/').rsplit('/', 1)[1]
+    assert client.get(f'/pso_schedule/{job_id}').status_code == 200
+
+    info = wait_for(client, job_id, {'done', 'failed'})
+    assert info['state'] == 'done' and info['result']['stop_reason'] == 'max_iterations'
+    page = client.get(f'/jobs/{job_id}/results')
+    assert page.status_code == 200 and b'Best Fitness' in page.data
+
+
+def test_full_queue_answers_429_and_jobs_cancel(manager, client):
+    manager(max_workers=1, max_queued=1)
+    endless = dict(PSO_FORM, max_iterations='100000000')
+    running = client.post('/jobs/pso', data=endless).get_json()['job_id']
+    queued = client.post('/jobs/pso', data=endless).get_json()['job_id']
+    assert client.post('/jobs/pso', data=endless).status_code == 429
+    assert client.post('/pso_schedule', data=endless).status_code == 429
+
+    assert client.post(f'/jobs/{queued}/cancel').status_code == 200
+    wait_for(client, running, {'running'})
+    assert client.post(f'/jobs/{running}/cancel').status_code == 200
+    assert wait_for(client, running, {'cancelled', 'done', 'failed'})['state'] == 'cancelled'
+    assert wait_for(client, queued, {'cancelled', 'done', 'failed'})['state'] == 'cancelled'
+    assert client.post('/jobs/unknown/cancel').status_code == 404
+
+
+def test_queue_limit_counts_active_jobs(manager):
+    jobs = manager(max_workers=1, max_queued=0)
+    params = app_module.parse_pso_form(MultiDict(dict(PSO_FORM, max_iterations='100000000')))
+    job_id = jobs.submit('pso', params)
+    with pytest.raises(JobQueueFull):
+        jobs.submit('pso', params)
+    jobs.cancel(job_id)
+
+
+def test_finished_jobs_expire_without_a_new_submit(manager):
+    jobs = manager(max_workers=1, ttl=0)
+    job_id = jobs.submit('pso', app_module.parse_pso_form(MultiDict(PSO_FORM)))
+    deadline = time.monotonic() + 60
+    while jobs.status(job_id) is not None:
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+    assert jobs.get(job_id) is None
+
+
+def test_ac3_job_cancels_during_a_long_search(tmp_path):
+    # Pigeonhole: 11 courses share 10 slots. Arc consistency cannot see it,
+    # so the search runs a long time without finding a single solution
+    rows = [dict(name=f"C{c}", program="P", instructor="X", id=str(100 * c + s), room="R",
+                 day="Monday", time=f"{8 + s:02d}:00-{8 + s:02d}:50", comments="")
+            for c in range(11) for s in range(10)]
+    path = tmp_path / 'courses.json'
+    path.write_text(json.dumps(rows))
+
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    started = time.monotonic()
+    result = run_ac3_job({'json_path': str(path), 'program': 'P'}, {}, [], cancel)
+    assert result == {'cancelled': True, 'solutions': 0, 'truncated': False}
+    assert time.monotonic() - started < 5
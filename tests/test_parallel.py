@@ -0,0 +1,72 @@
+from concurrent.futures import Future
+
+import pytest
+
+import ac3
+from ac3 import AC3
+from helpers import random_catalog
+from tracing import Tracer, OFF
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    # Enough solutions that small chunks split every subtree several times
+    return random_catalog(3, courses=8, max_sections=5)
+
+
+def test_parallel_matches_serial_order(catalog):
+    serial = AC3([], catalog, tracer=Tracer(OFF)).solve()
+    assert len(serial) > 10
+
+    algo = AC3([], catalog, tracer=Tracer(OFF))
+    assert list(algo.iter_solutions_parallel(workers=2, chunk_size=3)) == serial
+
+
+def test_parallel_limit_and_early_close_keep_serial_prefix(catalog):
+    serial = AC3([], catalog, tracer=Tracer(OFF)).solve()
+
+    algo = AC3([], catalog, tracer=Tracer(OFF))
+    assert list(algo.iter_solutions_parallel(workers=2, limit=7, chunk_size=2)) == serial[:7]
+
+    solutions = AC3([], catalog, tracer=Tracer(OFF)).iter_solutions_parallel(workers=2, chunk_size=2)
+    head = [next(solutions) for _ in range(5)]
+    solutions.close()
+    assert head == serial[:5]
+
+
+class InlineExecutor:
+    """ProcessPoolExecutor stand-in that runs tasks in-process and tracks unconsumed chunks."""
+    outstanding = 0
+    most = 0
+    prefixes = set()
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        initializer(*initargs)
+
+    def submit(self, fn, *args):
+        InlineExecutor.prefixes.add(args[0])
+        future = Future()
+        future.set_result(fn(*args))
+        cls = InlineExecutor
+        cls.outstanding += 1
+        cls.most = max(cls.most, cls.outstanding)
+        original = future.result
+
+        def result(timeout=None):
+            cls.outstanding -= 1
+            return original(timeout)
+        future.result = result
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_parallel_keeps_a_bounded_number_of_chunks(catalog, monkeypatch):
+    monkeypatch.setattr(ac3, 'ProcessPoolExecutor', InlineExecutor)
+    serial = AC3([], catalog, tracer=Tracer(OFF)).solve()
+
+    algo = AC3([], catalog, tracer=Tracer(OFF))
+    assert list(algo.iter_solutions_parallel(workers=2, chunk_size=1, tasks_per_worker=8)) == serial
+    assert len(InlineExecutor.prefixes) > 4
+    assert InlineExecutor.most <= 2 * 2
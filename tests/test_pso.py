@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+
+from helpers import random_pso_problem
+from pso import BinaryPSO, CompactBinaryPSO, IslandPSO
+
+SWARM = dict(num_particles=6, max_iterations=20, inertia_weight=0.7,
+             cognitive_coefficient=1.5, social_coefficient=1.5)
+WEIGHTS = dict(preference_weight=1, time_weight=3, label_weight=4, capacity_weight=2,
+               course_load_weight=5)
+
+
+def loop_fitness(pso, particle):
+    """The per-student loop fitness BinaryPSO.evaluate replaced, term for term."""
+    preference = time_clash = label = capacity = load = 0
+    for student in range(pso.num_students):
+        selected = np.where(particle[student] == 1)[0]
+        prefs = pso.student_preferences[student]
+        for course in selected:
+            if course not in prefs:
+                preference += 1
+        for i in range(len(selected)):
+            for j in range(i + 1, len(selected)):
+                time_clash += pso.clash_counts[selected[i], selected[j]]
+        counts = {}
+        for course in selected:
+            counts[pso.course_labels[course]] = counts.get(pso.course_labels[course], 0) + 1
+        label += sum(count - 1 for count in counts.values() if count > 1)
+        load += len(pso.unique_labels) - len(counts)
+    for course in range(pso.num_courses):
+        enrolled = np.sum(particle[:, course])
+        if enrolled > pso.course_caps[course]:
+            capacity += enrolled - pso.course_caps[course]
+    return (pso.preference_weight * preference + pso.time_weight * time_clash
+            + pso.label_weight * label + pso.capacity_weight * capacity
+            + pso.course_load_weight * load)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_batched_fitness_matches_loop(seed):
+    pso = BinaryPSO(**random_pso_problem(seed), **SWARM, **WEIGHTS, seed=seed)
+    positions = np.random.default_rng(seed).integers(0, 2, (8, pso.num_students, pso.num_courses))
+    expected = [loop_fitness(pso, particle) for particle in positions]
+    assert pso.evaluate(positions).tolist() == pytest.approx(expected)
+    assert pso.fitness_function(positions[0]) == pytest.approx(expected[0])
+
+
+def test_island_runs_are_reproducible_and_migrate():
+    problem = dict(random_pso_problem(1, students=10, courses=6), **SWARM, **WEIGHTS,
+                   target_fitness=None)
+    first = IslandPSO(3, migration_interval=4, seed=11, **problem)
+    position, fitness, history = first.run()
+    second = IslandPSO(3, migration_interval=4, seed=11, **problem)
+    again = second.run()
+
+    # Same master seed, same islands, same result
+    assert (again[0] == position).all() and again[1] == fitness
+    assert [s['history'] for s in second.island_stats] == [s['history'] for s in first.island_stats]
+
+    stats = first.island_stats
+    assert fitness == min(s['best_fitness'] for s in stats)
+    assert history.tolist() == np.min([s['history'] for s in stats], axis=0).tolist()
+    assert first.stop_reason == 'max_iterations' and len(history) == SWARM['max_iterations']
+    # The reported position really scores the reported fitness
+    reference = BinaryPSO(**problem, seed=0)
+    assert reference.fitness_function(position) == pytest.approx(fitness)
+
+    # After each migration an island is at least as good as the migrant it was sent
+    for m in range(4, SWARM['max_iterations'], 4):
+        for i in range(3):
+            assert stats[i]['history'][m] <= stats[i - 1]['history'][m - 1]
+
+
+def run_recorded(pso):
+    """run() with the swarm diversity recorded after every iteration."""
+    diversity = []
+    result = pso.run(callback=lambda iteration, best: diversity.append(pso.diversity()))
+    return result, diversity
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_history_and_patience(seed):
+    pso = BinaryPSO(**random_pso_problem(seed), **dict(SWARM, max_iterations=200), **WEIGHTS,
+                    seed=seed, target_fitness=None, patience=5)
+    _, best, history = pso.run()
+    history = history.tolist()
+    assert history[-1] == best == pso.global_best_fitness
+    assert all(a >= b for a, b in zip(history, history[1:]))
+
+    # Iterations since the best last improved, recomputed from the history
+    stale, previous, stop = 0, float('inf'), None
+    for iteration, value in enumerate(history, 1):
+        stale = 0 if value < previous else stale + 1
+        previous = min(previous, value)
+        if stale >= 5:
+            stop = iteration
+            break
+    assert stop == len(history) and pso.stop_reason == 'patience'
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_diversity_stop(seed):
+    pso = BinaryPSO(**random_pso_problem(seed), **dict(SWARM, max_iterations=200), **WEIGHTS,
+                    seed=seed, target_fitness=None, min_diversity=0.6)
+    (_, _, history), diversity = run_recorded(pso)
+    first_low = next((i for i, d in enumerate(diversity, 1) if d < 0.6), None)
+    if first_low is None:
+        assert pso.stop_reason == 'max_iterations' and len(history) == 200
+    else:
+        assert pso.stop_reason == 'diversity' and len(history) == first_low
+
+
+def test_target_and_max_iterations():
+    problem = dict(random_pso_problem(0), **SWARM, **WEIGHTS, seed=0)
+    pso = BinaryPSO(**problem, target_fitness=float('inf'))
+    _, _, history = pso.run()
+    assert pso.stop_reason == 'target' and len(history) == 1
+
+    pso = BinaryPSO(**problem, target_fitness=None)
+    _, _, history = pso.run()
+    assert pso.stop_reason == 'max_iterations' and len(history) == SWARM['max_iterations']
+
+
+@pytest.mark.parametrize('seed', range(15))
+def test_compact_matches_dense(seed):
+    problem = dict(random_pso_problem(seed), **SWARM, **WEIGHTS, seed=seed)
+    dense = BinaryPSO(**problem)
+    positions = np.random.default_rng(seed).integers(0, 2, (8, dense.num_students, dense.num_courses))
+
+    # Every course a candidate: the same problem in CSR layout
+    compact = CompactBinaryPSO(**problem, restrict_to_preferences=False)
+    entries = positions[:, compact.student_of, compact.indices].astype(np.uint8)
+    assert compact.evaluate(entries).tolist() == pytest.approx(dense.evaluate(positions).tolist())
+
+    # Packed bits come back as the same dense enrolment
+    compact.global_best_bits = np.packbits(entries[0])
+    assert (compact.global_best_position == positions[0]).all()
+
+    # Restricted to preferences: equal on positions that only use preferred courses
+    preferred = np.zeros((dense.num_students, dense.num_courses), dtype=bool)
+    for student, prefs in enumerate(problem['student_preferences']):
+        preferred[student, prefs] = True
+    positions = positions * preferred
+    restricted = CompactBinaryPSO(**problem)
+    entries = positions[:, restricted.student_of, restricted.indices].astype(np.uint8)
+    assert restricted.evaluate(entries).tolist() == pytest.approx(dense.evaluate(positions).tolist())
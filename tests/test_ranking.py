@@ -0,0 +1,43 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from ac3 import AC3
+from helpers import as_set, random_catalog, random_constraints
+from ranking import ScheduleObjective
+from tracing import Tracer, OFF
+
+
+def random_objective(seed, catalog):
+    """Random weights, plus instructors for every section and a preferred few."""
+    rng = random.Random(seed)
+    courses = [SimpleNamespace(id=cid, instructor=rng.choice('ABC')) for cid in catalog]
+    objective = ScheduleObjective(
+        days_weight=rng.choice([0, 1, 2.5]), gap_weight=rng.choice([0, 1, 0.5]),
+        instructor_weight=rng.choice([0, 1, 3]), edge_weight=rng.choice([0, 1]),
+        preferred_instructors=rng.sample('ABC', rng.randint(0, 2)),
+        earliest=rng.choice(['08:00', '10:00']), latest=rng.choice(['14:00', '17:00']))
+    return courses, objective
+
+
+@pytest.mark.parametrize('k', [1, 10, 1000])
+@pytest.mark.parametrize('seed', range(25))
+def test_top_k_matches_sorted_brute_force(seed, k):
+    catalog = random_catalog(seed, courses=5, max_sections=8)
+    picks, no_class = random_constraints(seed, catalog)
+    courses, objective = random_objective(seed, catalog)
+
+    algo = AC3(courses, catalog, picks, no_class, tracer=Tracer(OFF))
+    everything = algo.solve()
+    costs = objective.compile(algo.index, catalog, courses)
+    position = algo.index.position
+    expected = sorted(costs.cost([position[cid] for cid in sol.values()]) for sol in everything)
+
+    ranked = list(AC3(courses, catalog, picks, no_class, tracer=Tracer(OFF)).iter_ranked(objective, k))
+    assert [cost for cost, _ in ranked] == pytest.approx(expected[:k])
+    # Every ranked schedule is a real solution, with the cost it was ranked at
+    assert as_set(sol for _, sol in ranked) <= as_set(everything)
+    assert len(as_set(sol for _, sol in ranked)) == len(ranked)
+    for cost, sol in ranked:
+        assert costs.cost([position[cid] for cid in sol.values()]) == pytest.approx(cost)
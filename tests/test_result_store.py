@@ -0,0 +1,60 @@
+import result_store
+from result_store import ResultStore, canonical_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_store.time, 'monotonic', clock)
+    store = ResultStore(ttl=10)
+    store.put('a', 1, nbytes=5)
+    clock.now += 9
+    assert store.get('a') == 1
+    clock.now += 2
+    assert store.get('a') is None
+    assert len(store) == 0 and store.nbytes == 0
+
+
+def test_byte_budget_evicts_least_recently_used():
+    store = ResultStore(max_bytes=100)
+    store.put('a', 'A', nbytes=40)
+    store.put('b', 'B', nbytes=40)
+    assert store.get('a') == 'A'        # b is now the least recently used
+    store.put('c', 'C', nbytes=40)
+    assert store.get('b') is None
+    assert store.get('a') == 'A' and store.get('c') == 'C'
+    assert store.nbytes == 80
+
+    # Replacing an entry releases its old size
+    store.put('a', 'A2', nbytes=10)
+    assert store.nbytes == 50
+
+
+def test_setdefault_keeps_the_live_value(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_store.time, 'monotonic', clock)
+    store = ResultStore(ttl=10)
+    first = store.setdefault('k', ['first'], nbytes=8)
+    assert store.setdefault('k', ['second'], nbytes=8) is first
+    assert (store.hits, store.misses, store.nbytes) == (1, 1, 8)
+
+    # An expired entry is replaced, not returned
+    clock.now += 11
+    assert store.setdefault('k', ['third'], nbytes=8) == ['third']
+    assert store.nbytes == 8
+
+
+def test_canonical_key_ignores_order_and_duplicates():
+    key = canonical_key(('courses.json', 1, 2), 'BSCS-4', ['2', '1', '1'],
+                        [('Monday', '08:30-09:45'), ['Friday', '10:00-11:15']])
+    assert key == canonical_key(('courses.json', 1, 2), 'BSCS-4', ['1', '2'],
+                                [('Friday', '10:00-11:15'), ('Monday', '08:30-09:45')])
+    assert key != canonical_key(('courses.json', 1, 2), 'BSCS-3', ['1', '2'],
+                                [('Friday', '10:00-11:15'), ('Monday', '08:30-09:45')])
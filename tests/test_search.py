@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+import ac3
+from ac3 import AC3
+from helpers import as_set, brute_force, random_catalog, random_constraints
+from tracing import Tracer, OFF
+
+
+@pytest.mark.parametrize('propagation', ['fc', 'mac'])
+@pytest.mark.parametrize('seed', range(40))
+def test_search_matches_brute_force(seed, propagation):
+    catalog = random_catalog(seed)
+    picks, no_class = random_constraints(seed, catalog)
+    algo = AC3([], catalog, picks, no_class, tracer=Tracer(OFF), propagation=propagation)
+    # Domains after picks and no-class slots, before AC-3 prunes anything
+    expected = brute_force(catalog, algo.domains)
+
+    solutions = algo.solve()
+    assert len(solutions) == len(expected)
+    assert as_set(solutions) == as_set(expected)
+
+
+def test_cursor_resumes_after_each_solution():
+    catalog = random_catalog(7, courses=6)
+    everything = AC3([], catalog, tracer=Tracer(OFF)).solve()
+    assert everything
+
+    first = AC3([], catalog, tracer=Tracer(OFF))
+    head = list(first.iter_solutions(limit=3))
+    rest = list(AC3([], catalog, tracer=Tracer(OFF)).iter_solutions(cursor=first.cursor))
+    assert head + rest == everything
+
+
+def test_unknown_propagation_mode():
+    with pytest.raises(ValueError):
+        AC3([], random_catalog(0), tracer=Tracer(OFF), propagation='full').solve()
+
+
+def test_program_domains_are_kept_per_catalog_file(monkeypatch):
+    monkeypatch.setattr(ac3, '_program_domains', {})
+    monkeypatch.setattr(ac3, 'precompute_program_domains', lambda catalog, workers=None: {'v': catalog.version})
+    a1, b1, a2 = (SimpleNamespace(version=v) for v in [('a', 1, 10), ('b', 1, 10), ('a', 2, 10)])
+
+    assert ac3.program_domains(a1) == {'v': a1.version}
+    assert ac3.program_domains(b1) == {'v': b1.version}
+    assert set(ac3._program_domains) == {a1.version, b1.version}
+    # A new version of one file replaces only that file's entry
+    ac3.program_domains(a2)
+    assert set(ac3._program_domains) == {a2.version, b1.version}
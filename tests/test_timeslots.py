@@ -0,0 +1,25 @@
+from ac3 import AC3
+from timeslots import IntervalModel
+from tracing import Tracer, OFF
+
+
+def test_unparseable_meetings_are_unscheduled():
+    model = IntervalModel(['a', 'b', 'c'], [['Monday 08:30-09:45'], ['TBA TBA'],
+                                            ['Monday 09:00-10:00', 'Funday later']])
+    assert model.unscheduled == [('b', 'TBA TBA'), ('c', 'Funday later')]
+    assert model.segment_masks()[1] == 0
+    assert model.overlap_matrix().tolist() == [[False, False, True],
+                                              [False, False, False],
+                                              [True, False, False]]
+    assert model.mask_of(['Funday later']) == 0
+
+
+def test_tba_section_fits_every_schedule():
+    catalog = {
+        '1': {'constraints': ['Monday 08:30-09:45'], 'course_name': 'A'},
+        '2': {'constraints': ['Monday 09:00-10:00'], 'course_name': 'A'},
+        '3': {'constraints': ['TBA TBA'], 'course_name': 'B'},
+    }
+    solutions = AC3([], catalog, no_class_constraints=[('Funday', 'later')],
+                    tracer=Tracer(OFF)).solve()
+    assert solutions == [{'A': '1', 'B': '3'}, {'A': '2', 'B': '3'}]
@@ -0,0 +1,193 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAY_INDEX = {}
+for _i, _day in enumerate(DAYS):
+    DAY_INDEX[_day.lower()] = _i
+    DAY_INDEX[_day[:3].lower()] = _i
+DAY_INDEX['tues'] = 1
+DAY_INDEX['thur'] = DAY_INDEX['thurs'] = 3
+
+
+def parse_day(day):
+    """'Monday', 'mon', 'Mon ' -> 0 .. 6"""
+    try:
+        return DAY_INDEX[str(day).strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown day: {day!r}") from None
+
+
+def parse_clock(value):
+    """'08:30' -> 510, '14' / 14 -> 840 (minutes since midnight)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value) * 60
+    if isinstance(value, float):
+        return int(round(value * 60))
+    text = str(value).strip()
+    if ':' in text:
+        hours, minutes = text.split(':', 1)
+        return int(hours) * 60 + int(minutes)
+    return int(text) * 60
+
+
+
+def format_slot(day_index, start, end):
+    """(0, 510, 585) -> 'Monday 08:30-09:45'; start/end are minutes since midnight."""
+    return f"{DAYS[day_index]} {start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+
+def parse_slot(slot):
+    """
+    Accept either:
+      - A string "Day HH:MM-HH:MM" (also "Day HH-HH" or with an en dash)
+      - A list/tuple [Day, start, end] with hours or "HH:MM" strings
+    Returns (start, end) in minutes since the start of the week (Monday 00:00).
+    """
+    if isinstance(slot, str):
+        day, time_range = slot.strip().split(None, 1)
+        start, end = time_range.replace('–', '-').replace(' ', '').split('-')
+    elif isinstance(slot, (list, tuple)) and len(slot) == 3:
+        day, start, end = slot
+    else:
+        raise ValueError(f"Invalid time slot format: {slot!r}")
+
+    base = parse_day(day) * MINUTES_PER_DAY
+    return base + parse_clock(start), base + parse_clock(end)
+
+
+def intervals_overlap(starts_a, ends_a, starts_b, ends_b):
+    """Vectorized test: does any interval of a overlap any interval of b?"""
+    starts_a = np.asarray(starts_a)[:, None]
+    ends_a = np.asarray(ends_a)[:, None]
+    return bool(np.any((starts_a < np.asarray(ends_b)) & (np.asarray(starts_b) < ends_a)))
+
+
+def slots_overlap(slots_a, slots_b):
+    """True if any slot in slots_a overlaps any slot in slots_b."""
+    a = np.array([parse_slot(s) for s in slots_a], dtype=np.int32).reshape(-1, 2)
+    b = np.array([parse_slot(s) for s in slots_b], dtype=np.int32).reshape(-1, 2)
+    return intervals_overlap(a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+
+
+class IntervalModel:
+    """
+    Compiled meeting times for a set of keys (section ids, PSO course indices).
+
+    All meetings live in flat int32 ``starts``/``ends`` arrays (minutes since
+    the start of the week) with ``owner`` giving the key position of each one,
+    so slot strings are parsed once when the model is built.  Two meetings
+    overlap when ``start_a < end_b and start_b < end_a``; back-to-back
+    meetings do not clash.  Meetings whose slot cannot be parsed (e.g. a
+    'TBA' row) are left out and listed in ``unscheduled``: they get no mask
+    bits and overlap nothing.
+    """
+
+    def __init__(self, keys, slot_lists):
+        """
+        :keys: sequence of hashable keys
+        :slot_lists: one list of slots per key, in any format parse_slot accepts
+        """
+        self.keys = list(keys)
+        self.position = {key: i for i, key in enumerate(self.keys)}
+
+        starts, ends, owner = [], [], []
+        self.unscheduled = []   # (key, slot) pairs that could not be parsed
+        for pos, slots in enumerate(slot_lists):
+            for slot in slots:
+                try:
+                    start, end = parse_slot(slot)
+                except ValueError:
+                    self.unscheduled.append((self.keys[pos], slot))
+                    continue
+                starts.append(start)
+                ends.append(end)
+                owner.append(pos)
+        self.starts = np.array(starts, dtype=np.int32)
+        self.ends = np.array(ends, dtype=np.int32)
+        self.owner = np.array(owner, dtype=np.int32)
+
+        # Elementary segments between consecutive distinct boundaries; a
+        # key's mask covers the segments its meetings span, so two keys
+        # overlap exactly when their masks share a bit.
+        self.bounds = np.unique(np.concatenate([self.starts, self.ends])).tolist()
+        self._segment_masks = None
+
+    @classmethod
+    def from_constraints(cls, cid_constraints):
+        """Build from get_course_id_constraint_mapping() output."""
+        return cls(cid_constraints, [info['constraints'] for info in cid_constraints.values()])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def overlap_pairs(self):
+        """
+        All overlapping meeting pairs between different keys, as two arrays
+        of key positions (one entry per overlapping pair of meetings).
+        Sweep over meetings sorted by start: meeting i overlaps exactly the
+        later-starting meetings whose start lies before its end.
+        """
+        order = np.argsort(self.starts, kind='stable')
+        starts = self.starts[order]
+        ends = self.ends[order]
+        owner = self.owner[order]
+
+        reach = np.searchsorted(starts, ends, side='left')
+        first = np.arange(len(starts)) + 1
+        counts = np.maximum(reach - first, 0)
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty
+
+        left = np.repeat(np.arange(len(starts)), counts)
+        step = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        right = np.repeat(first, counts) + step
+
+        a, b = owner[left], owner[right]
+        keep = a != b
+        return a[keep], b[keep]
+
+    def overlap_counts(self):
+        """Symmetric key x key matrix: number of overlapping meeting pairs."""
+        n = len(self.keys)
+        counts = np.zeros((n, n), dtype=np.int32)
+        a, b = self.overlap_pairs()
+        np.add.at(counts, (a, b), 1)
+        np.add.at(counts, (b, a), 1)
+        return counts
+
+    def overlap_matrix(self):
+        """Symmetric boolean key x key matrix: do the two keys ever overlap?"""
+        return self.overlap_counts() > 0
+
+    def span_mask(self, start, end):
+        """Mask of the elementary segments that [start, end) touches."""
+        lo = max(bisect_right(self.bounds, start) - 1, 0)
+        hi = min(bisect_left(self.bounds, end), len(self.bounds) - 1)
+        if hi <= lo:
+            return 0
+        return ((1 << hi) - 1) ^ ((1 << lo) - 1)
+
+    def segment_masks(self):
+        """One integer mask per key, in key order."""
+        if self._segment_masks is None:
+            masks = [0] * len(self.keys)
+            for start, end, pos in zip(self.starts.tolist(), self.ends.tolist(), self.owner.tolist()):
+                masks[pos] |= self.span_mask(start, end)
+            self._segment_masks = masks
+        return self._segment_masks
+
+    def mask_of(self, slots):
+        """Mask for arbitrary slots, e.g. the user's no-class times; unparseable ones block nothing."""
+        mask = 0
+        for slot in slots:
+            try:
+                start, end = parse_slot(slot)
+            except ValueError:
+                continue
+            mask |= self.span_mask(start, end)
+        return mask
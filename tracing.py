@@ -0,0 +1,59 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Trace levels, from quietest to noisiest
+OFF = 0
+SUMMARY = 1   # a handful of lines per run: domain sizes, counters, phase times
+ARC = 2       # one line per revised arc / pruned value
+CHECK = 3     # one line per conflict check
+
+LEVELS = {'off': OFF, 'summary': SUMMARY, 'arc': ARC, 'check': CHECK}
+
+logger = logging.getLogger("scheduler.trace")
+
+
+class Tracer:
+    """
+    Level-gated event log plus counters and per-phase timings for a solver run.
+
+    Callers guard anything that formats a string with ``tracer.level >= ARC``
+    (or CHECK), so at the default SUMMARY level the hot loops only bump
+    counters.  ``events`` is what the web layer shows as the run's progress.
+    """
+
+    def __init__(self, level=SUMMARY):
+        if isinstance(level, str):
+            level = LEVELS[level.lower()]
+        self.level = level
+        self.events = []
+        self.counters = Counter()
+        self.timings = {}
+
+    def emit(self, level, message):
+        """Record message if the tracer is at least as verbose as level."""
+        if self.level >= level:
+            self.events.append(message)
+            logger.debug(message)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Accumulate wall time spent inside the block under name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def summary(self):
+        """One-line rendering of the counters and phase timings."""
+        counts = ", ".join(f"{k}={v}" for k, v in sorted(self.counters.items()))
+        times = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in self.timings.items())
+        return f"Counters: {counts or 'none'} | Time: {times or 'n/a'}"